@@ -0,0 +1,225 @@
+"""Read-only JSON API over the same data store as the Streamlit app.
+
+    uvicorn api:app
+
+    GET /leaderboards/{name}/top?n=100
+    GET /leaderboards/{name}/percentiles
+    GET /leaderboards/{name}/history?window=14d
+    GET /metrics
+
+``/metrics`` serves the profiling counters (``utils.profiling``) in the
+Prometheus text format.
+
+Set ``TFWR_DATA_URL`` (e.g. ``file:///srv/tfwr``) to serve a copy of the
+published files instead of S3.
+
+Every response is serialized (and gzipped) once per data version and then
+served from memory; ``ETag``/``If-None-Match`` turns repeat polls into 304s.
+Cache misses are built off the event loop.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from urllib.parse import parse_qs
+
+import pandas as pd
+
+from utils.cache import LRUCache
+from utils.constants import (
+    API_CACHE_BYTES,
+    API_CACHE_ENTRIES,
+    API_MAX_TOP_N,
+    HISTORY_CHART_POINTS,
+    HISTORY_DEFAULT_WINDOW,
+    HISTORY_WINDOWS,
+    TABS,
+)
+from utils.downsample import downsample, m4_buckets
+from utils.partition import top_by_rank
+from utils.prettify import top_1_column
+from utils.profiling import metrics
+from utils.rollups import build_rollups, pick_resolution
+from utils.store import DEFAULT_URLS, DataStore, urls_for
+
+GZIP_MIN_BYTES = 1024
+PROMETHEUS_CONTENT_TYPE = b"text/plain; version=0.0.4"
+TOP_COLUMNS = ["rank", "steam_name", "duration_ms", "gap_prev_ms", "gap_leader_ms", "achieved_at"]
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Response:
+    """A serialized body with its ETag and gzipped copy, built once."""
+
+    def __init__(self, body, status=200, content_type=b"application/json"):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'.encode()
+        self.gzipped = gzip.compress(body, 5) if len(body) >= GZIP_MIN_BYTES else None
+
+    @property
+    def size(self):
+        return len(self.body) + len(self.gzipped or b"")
+
+
+def _json(value):
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _records(df):
+    # pandas' writer: NaN -> null, timestamps as ISO 8601
+    return df.to_json(orient="records", date_format="iso", date_unit="ms").encode()
+
+
+def _int_param(query, name, default, lo, hi):
+    raw = query.get(name, [None])[0]
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+    if not lo <= value <= hi:
+        raise ApiError(400, f"{name} must be between {lo} and {hi}")
+    return value
+
+
+class LeaderboardApi:
+    def __init__(self, store):
+        self.store = store
+        self.responses = LRUCache(API_CACHE_ENTRIES, API_CACHE_BYTES)
+        self.routes = {"top": self.top, "percentiles": self.percentiles, "history": self.history}
+
+    # Endpoints: each returns (cache key, build) so the body is only built on a miss
+
+    def top(self, name, query):
+        data = self.store.data
+        n = _int_param(query, "n", 100, 1, API_MAX_TOP_N)
+
+        def build():
+            board = top_by_rank(data.snapshot[name], n)[TOP_COLUMNS]
+            return b'{"leaderboard":%s,"n":%d,"entries":%s}' % (_json(name), n, _records(board))
+
+        return ("top", name, n, data.snapshot_version), build
+
+    def percentiles(self, name, query):
+        data = self.store.data
+
+        def build():
+            record = data.percentiles.get(name)
+            if record is None:
+                raise ApiError(404, f"No percentiles for {name}")
+            values = pd.Series(record).drop("leaderboard_name", errors="ignore")
+            return b'{"leaderboard":%s,"percentiles":%s}' % (_json(name), values.to_json().encode())
+
+        return ("percentiles", name, data.percentiles_version), build
+
+    def history(self, name, query):
+        window = query.get("window", [HISTORY_DEFAULT_WINDOW])[0]
+        if window not in HISTORY_WINDOWS:
+            raise ApiError(400, f"window must be one of {', '.join(HISTORY_WINDOWS)}")
+        data = self.store.history_data()
+
+        def build():
+            board = data.over_time[name]
+            window_days = HISTORY_WINDOWS[window]
+            span = board["time"].max() - board["time"].min() if len(board) else None
+            ms_cols = [c for c in board.columns if c.endswith("_ms")]
+            resolution = pick_resolution(
+                window_days, span, m4_buckets(HISTORY_CHART_POINTS, max(len(ms_cols), 1))
+            )
+            if resolution != "raw":
+                rollups = self.store.derive(
+                    "rollups", data.history_version, lambda: build_rollups(data.over_time)
+                )
+                board = rollups[resolution][name]
+            if window_days is not None and len(board):
+                board = board[board["time"] >= board["time"].max() - pd.Timedelta(days=window_days)]
+            top_1 = top_1_column(ms_cols)
+            board = downsample(
+                board, "time", ms_cols, HISTORY_CHART_POINTS, [top_1] if top_1 else []
+            )
+            return b'{"leaderboard":%s,"window":%s,"resolution":%s,"points":%s}' % (
+                _json(name), _json(window), _json(resolution), _records(board[["time"] + ms_cols])
+            )
+
+        return ("history", name, window, data.history_version), build
+
+    async def respond(self, path, query):
+        if path == "/metrics":
+            # Changes with every profiled run: built per request, never cached
+            return Response(metrics.prometheus().encode(), content_type=PROMETHEUS_CONTENT_TYPE)
+        # ASGI servers have already percent-decoded the path
+        parts = path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "leaderboards" or parts[2] not in self.routes:
+            raise ApiError(404, "Not found")
+        name = parts[1]
+        if name not in TABS[1:]:
+            raise ApiError(404, f"Unknown leaderboard {name}")
+
+        key, build = self.routes[parts[2]](name, query)
+        response = self.responses.get(key)
+        if response is None:
+            body = await asyncio.to_thread(build)
+            response = Response(body)
+            self.responses.put(key, response, size=response.size)
+        return response
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        headers = dict(scope["headers"])
+        try:
+            if scope["method"] not in ("GET", "HEAD"):
+                raise ApiError(405, "Method not allowed")
+            response = await self.respond(scope["path"], parse_qs(scope["query_string"].decode()))
+        except ApiError as e:
+            response = Response(_json({"error": str(e)}), e.status)
+
+        out = [
+            (b"content-type", response.content_type),
+            (b"etag", response.etag),
+            (b"cache-control", b"no-cache"),
+            (b"vary", b"accept-encoding"),
+        ]
+        status, body = response.status, response.body
+        if status == 200 and headers.get(b"if-none-match") == response.etag:
+            status, body = 304, b""
+        elif response.gzipped is not None and b"gzip" in headers.get(b"accept-encoding", b""):
+            body = response.gzipped
+            out.append((b"content-encoding", b"gzip"))
+        out.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": out})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Load everything before taking traffic, then keep refreshing in the background
+                await asyncio.to_thread(self.store.history_data)
+                self.store.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_app(data_url=None):
+    data_url = data_url or os.environ.get("TFWR_DATA_URL")
+    return LeaderboardApi(DataStore(urls=urls_for(data_url) if data_url else DEFAULT_URLS))
+
+
+app = create_app()
@@ -0,0 +1,117 @@
+"""Load test of the JSON API (api.py) served by uvicorn from a local data directory.
+
+Writes a synthetic dataset (or uses ``--data-url``), starts ``uvicorn api:app``
+in a subprocess and hits a mix of endpoints from concurrent keep-alive
+connections. Half the clients revalidate with ``If-None-Match`` like a polling
+bot would. Prints one JSON line per run.
+
+    python -m benchmarks.bench_api [--seconds 10] [--concurrency 64]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+import numpy as np
+
+from benchmarks.synthetic import LEADERBOARDS, write_dataset
+
+PATHS = [f"/leaderboards/{name}/top?n=100" for name in LEADERBOARDS[:4]] + [
+    "/leaderboards/Hay/percentiles",
+    "/leaderboards/Hay/history?window=14d",
+    "/leaderboards/Maze/history?window=All",
+]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(base, timeout=300):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(base + PATHS[0]) as r:
+                    if r.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("API did not start")
+
+
+async def _client(base, seconds, revalidate, latencies, statuses, n):
+    etags = {}
+    headers = {"Accept-Encoding": "gzip"}
+    async with aiohttp.ClientSession(base, headers=headers) as session:
+        deadline = time.perf_counter() + seconds
+        i = n
+        while time.perf_counter() < deadline:
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            extra = {"If-None-Match": etags[path]} if revalidate and path in etags else {}
+            start = time.perf_counter()
+            async with session.get(path, headers=extra) as r:
+                await r.read()
+                etags[path] = r.headers.get("ETag")
+                statuses[r.status] = statuses.get(r.status, 0) + 1
+            latencies.append(time.perf_counter() - start)
+
+
+async def _load(base, seconds, concurrency):
+    latencies, statuses = [], {}
+    await asyncio.gather(*(
+        _client(base, seconds, n % 2 == 1, latencies, statuses, n) for n in range(concurrency)
+    ))
+    ms = np.array(latencies) * 1e3
+    return {
+        "requests": len(ms),
+        "rps": len(ms) / seconds,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "statuses": statuses,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-url", help="serve these files instead of a synthetic dataset")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_url = args.data_url
+        if data_url is None:
+            data_url = write_dataset(directory, args.days, args.entries)["over_time"][0].rsplit("/", 1)[0]
+        port = _free_port()
+        env = dict(os.environ, TFWR_DATA_URL=data_url, TFWR_CACHE_DIR=os.path.join(directory, "cache"))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+            env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        try:
+            base = f"http://127.0.0.1:{port}"
+            asyncio.run(_wait_ready(base))
+            result = asyncio.run(_load(base, args.seconds, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+    result.update(concurrency=args.concurrency, seconds=args.seconds, data_url=args.data_url)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
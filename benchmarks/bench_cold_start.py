@@ -0,0 +1,64 @@
+"""Time to first render of a page on a cold process.
+
+Each measurement runs in a fresh interpreter with an empty object cache: it
+imports the app, loads the synthetic dataset from local files and renders one
+page once (with Streamlit's AppTest, no browser). Also reports which heavy
+modules the page pulled in.
+
+    python -m benchmarks.bench_cold_start [days] [entries_per_board] [runs]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic import write_dataset
+
+_CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+import utils.store
+utils.store.DEFAULT_URLS.update(json.loads(sys.argv[1]))
+at = AppTest.from_file("main.py", default_timeout=600)
+if sys.argv[2] != "Overview":
+    at.query_params["leaderboard"] = sys.argv[2]
+at.run()
+elapsed = time.perf_counter() - start
+assert not at.exception, at.exception
+print(json.dumps({
+    "seconds": elapsed,
+    "modules": {m: m in sys.modules for m in ["altair", "s3fs", "pyarrow"]},
+}))
+"""
+
+PAGES = ["Overview", "Hay"]
+
+
+def measure(urls, page, cache_dir):
+    env = dict(os.environ, TFWR_CACHE_DIR=cache_dir)
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, json.dumps(urls), page],
+        capture_output=True, text=True, check=True, env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(days=30, entries=5000, runs=3):
+    with tempfile.TemporaryDirectory() as directory:
+        urls = write_dataset(os.path.join(directory, "data"), days, entries)
+        for page in PAGES:
+            results = []
+            for i in range(runs):
+                cache_dir = os.path.join(directory, f"cache-{page}-{i}")
+                results.append(measure(urls, page, cache_dir))
+            best = min(r["seconds"] for r in results)
+            print(f"{page:>10}: {best:6.2f} s to first render (best of {runs}), "
+                  f"imported {results[-1]['modules']}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,57 @@
+"""Leaderboard table formatting: per-row ``apply`` vs the vectorized stage.
+
+    python -m benchmarks.bench_formatting [n_rows]
+"""
+
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_snapshot
+from utils.prettify import add_display_columns, format_delta
+from utils.typing import gap_ms_to_str, ms_to_str
+
+
+def legacy_display_columns(df):
+    # The pre-vectorization path from display_leaderboard
+    df["Time"] = df["duration_ms"].apply(ms_to_str)
+    df["Gap"] = df["gap_prev_ms"].apply(gap_ms_to_str)
+    df["Gap To Leader"] = df["gap_leader_ms"].apply(gap_ms_to_str)
+    now = pd.to_datetime("now", utc=True)
+    df["Date"] = (
+        df["achieved_at"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        + " ("
+        + (now - df["achieved_at"]).apply(format_delta)
+        + ")"
+    )
+    return df
+
+
+def _time(fn, df, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        fn(frame)
+        best = min(best, time.perf_counter() - start)
+    return best, frame
+
+
+def main(n_rows=1_000_000):
+    df = make_snapshot(n_rows)
+    legacy_s, legacy = _time(legacy_display_columns, df, repeat=1)
+    vector_s, vector = _time(add_display_columns, df)
+
+    # Date is cached without its relative "(... ago)" part, which is added per render
+    legacy["Date"] = legacy["Date"].str.split(" (", regex=False).str[0]
+    cols = ["Time", "Gap", "Gap To Leader", "Date"]
+    mismatches = {c: int((legacy[c].astype(str) != vector[c].astype(str)).sum()) for c in cols}
+    print(f"rows:        {n_rows:,}")
+    print(f"legacy:      {legacy_s:.3f}s")
+    print(f"vectorized:  {vector_s:.3f}s ({legacy_s / vector_s:.1f}x)")
+    print(f"mismatches:  {mismatches}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,35 @@
+"""History chart payload size and build time, with and without downsampling.
+
+    python -m benchmarks.bench_history_chart [days] [interval_minutes]
+"""
+
+import sys
+import time
+
+import altair as alt
+
+from benchmarks.synthetic import make_over_time
+from utils.altair_charts import build_over_time_chart, prepare_over_time_data
+from utils.constants import HISTORY_CHART_POINTS
+from utils.partition import partition_by_leaderboard
+
+
+def _render(board, leaderboard_name, max_points):
+    start = time.perf_counter()
+    data = prepare_over_time_data(board, hide_top_100=True, max_points=max_points)
+    spec = build_over_time_chart(*data, leaderboard_name).to_json()
+    return time.perf_counter() - start, len(spec), len(data[0])
+
+
+def main(days=14, interval_minutes=1):
+    alt.data_transformers.disable_max_rows()
+    over_time = partition_by_leaderboard(make_over_time(days, interval_minutes), "time")
+    board = over_time["Hay"]
+    cases = [("raw", len(board) + 1), ("downsampled", HISTORY_CHART_POINTS)]
+    for label, max_points in cases:
+        elapsed, size, points = _render(board, "Hay", max_points)
+        print(f"{label:12s} {points:8,} points  {size / 2**20:7.2f} MiB  {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,37 @@
+"""Per-frame memory before and after compact dtypes.
+
+    python -m benchmarks.bench_memory [history_days] [snapshot_rows]
+"""
+
+import io
+import sys
+
+import pandas as pd
+
+from benchmarks.synthetic import make_over_time, make_snapshot
+from utils.schema import compact_frame, memory_report
+
+
+def _as_loaded(df, time_col):
+    # Round-trip through CSV so dtypes match what the loaders get from read_csv
+    df = pd.read_csv(io.StringIO(df.to_csv(index=False)))
+    df[time_col] = pd.to_datetime(df[time_col], format="mixed", utc=True)
+    return df
+
+
+def main(history_days=90, snapshot_rows=200_000):
+    before = {
+        "over_time": _as_loaded(make_over_time(history_days), "time"),
+        "gaps_latest": _as_loaded(make_snapshot(snapshot_rows), "achieved_at"),
+    }
+    after = {name: compact_frame(df) for name, df in before.items()}
+    report = memory_report(before, after)
+    report["before_mib"] = report["before_bytes"] / 2**20
+    report["after_mib"] = report["after_bytes"] / 2**20
+    print(report[["before_mib", "after_mib", "ratio"]].round(3).to_string())
+    for name, df in after.items():
+        print(f"\n{name}:\n{df.dtypes.to_string()}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""Overview page rerun latency with every board, after the data is loaded.
+
+Renders the Overview once with Streamlit's AppTest (no browser) to warm the
+store, then times reruns, i.e. what each visitor interaction costs.
+
+    python -m benchmarks.bench_overview [entries_per_board] [reruns]
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import write_dataset
+from utils.store import DEFAULT_URLS
+
+
+def main(entries=5000, reruns=20):
+    with tempfile.TemporaryDirectory() as directory:
+        DEFAULT_URLS.update(write_dataset(directory, 30, entries))
+        at = AppTest.from_file("../main.py", default_timeout=600)
+        at.run()
+        assert not at.exception, at.exception
+        times = []
+        for _ in range(reruns):
+            start = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - start)
+    print(
+        f"Overview rerun: median {statistics.median(times) * 1e3:.1f} ms, "
+        f"min {min(times) * 1e3:.1f} ms over {reruns} reruns, {len(at.main)} top-level elements"
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,131 @@
+"""Concurrent sessions reading the data: per-session copies vs the shared store.
+
+``st.cache_data`` keeps the pickled value and unpickles a fresh copy for every
+call, so each session's rerun pays a deserialization and holds its own frames.
+The shared ``DataStore`` hands every session the same objects. Each simulated
+session reads the data and the derived indexes the way a board page does, and
+keeps the last value it read, like a live session does.
+
+The copies are read ``reruns`` times per session. Against the store, sessions
+rerun every 50 ms while a publisher thread rewrites the snapshot file and
+refreshes ``publishes`` times, so reads race version swaps and every new
+version's indexes are derived under load.
+
+    python -m benchmarks.bench_sessions [sessions] [reruns] [entries_per_board] [publishes]
+"""
+
+import pickle
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import write_dataset
+from utils.fetch import ObjectCache
+from utils.players import PlayerIndex
+from utils.ranks import DurationIndex
+from utils.schema import frame_bytes
+from utils.store import DataStore
+
+
+def _run_sessions(read, sessions, reruns, until=None, pause=0.0):
+    # `reruns` each, or with `until` given, rerun every `pause` seconds until it is set
+    held = [None] * sessions
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(sessions)
+
+    def session(i):
+        barrier.wait()
+        n = 0
+        while (n < reruns) if until is None else not until.is_set():
+            start = time.perf_counter()
+            held[i] = read()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+            n += 1
+            time.sleep(pause)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return latencies, wall, current, peak
+
+
+def _publisher(store, path, versions, publishes, done):
+    # Alternate between two snapshot files, refreshing after each publish
+    for n in range(publishes):
+        time.sleep(0.1)
+        path.write_bytes(versions[n % 2])
+        store.refresh()
+    done.set()
+
+
+def main(sessions=20, reruns=5, entries_per_board=5000, publishes=4):
+    with tempfile.TemporaryDirectory() as directory:
+        urls = write_dataset(Path(directory) / "a", 30, entries_per_board)
+        other = write_dataset(Path(directory) / "b", 1, entries_per_board, seed=1)
+        snapshot_path = Path(urls["gaps_latest"][0].removeprefix("file://"))
+        versions = [Path(other["gaps_latest"][0].removeprefix("file://")).read_bytes(),
+                    snapshot_path.read_bytes()]
+
+        store = DataStore(urls=urls, cache=ObjectCache(cache_dir=None))
+        data = store.history_data()
+        print(f"data: {frame_bytes(data.over_time) / 2**20:.1f} MiB history, "
+              f"{frame_bytes(data.snapshot) / 2**20:.1f} MiB snapshot")
+
+        def rerun_shared():
+            data = store.history_data()
+            store.derive("players", data.snapshot_version, lambda: PlayerIndex(data.snapshot))
+            store.derive("durations", data.snapshot_version, lambda: DurationIndex(data.snapshot))
+            return data
+
+        rerun_shared()  # the first version's indexes, as a warm app would have them
+        pickled = pickle.dumps(
+            {
+                "over_time": data.over_time,
+                "snapshot": data.snapshot,
+                "players": PlayerIndex(data.snapshot),
+                "durations": DurationIndex(data.snapshot),
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+        def report(label, latencies, wall, current, peak):
+            latencies.sort()
+            p95 = latencies[int(0.95 * (len(latencies) - 1))]
+            print(
+                f"{label:>16}: median {statistics.median(latencies) * 1e3:8.2f} ms, "
+                f"p95 {p95 * 1e3:8.2f} ms, max {latencies[-1] * 1e3:8.2f} ms, "
+                f"wall {wall:6.2f} s, held {current / 2**20:7.1f} MiB, "
+                f"peak {peak / 2**20:7.1f} MiB, {len(latencies)} reruns"
+            )
+
+        print(f"{sessions} sessions")
+        report("copy per access", *_run_sessions(lambda: pickle.loads(pickled), sessions, reruns))
+
+        # Sessions keep rerunning while `publishes` new snapshot versions land
+        done = threading.Event()
+        publisher = threading.Thread(
+            target=_publisher, args=(store, snapshot_path, versions, publishes, done)
+        )
+        publisher.start()
+        result = _run_sessions(rerun_shared, sessions, reruns, until=done, pause=0.05)
+        publisher.join()
+        report("shared store", *result)
+        print(f"{'':>16}  snapshot version {data.snapshot_version} -> "
+              f"{store.data.snapshot_version} during the run")
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
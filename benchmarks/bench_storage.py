@@ -0,0 +1,87 @@
+"""History file parse time and peak memory: CSV vs Parquet.
+
+    python -m benchmarks.bench_storage [days]
+"""
+
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pyarrow as pa
+
+from benchmarks.synthetic import make_over_time
+from utils.fetch import ObjectCache
+from utils.storage import read_csv_table, read_table, write_parquet
+
+
+def _measure(label, fn, queue):
+    # Runs in a fresh process so Arrow's pool high-water mark only covers this read;
+    # numpy/pandas allocations are traced by tracemalloc in a second, untimed read
+    start = time.perf_counter()
+    df = fn()
+    elapsed = time.perf_counter() - start
+    del df
+    tracemalloc.start()
+    df = fn()
+    _, python_peak = tracemalloc.get_traced_memory()
+    peak = python_peak + pa.default_memory_pool().max_memory()
+    queue.put((label, elapsed, peak / 2**20, len(df)))
+
+
+def _read_csv(csv_path):
+    return read_csv_table(csv_path, time_cols=["time"])
+
+
+def _read_parquet(parquet_path):
+    return read_table(parquet_path, None, cache=ObjectCache(cache_dir=None))
+
+
+def _read_parquet_one_board(parquet_path):
+    return read_table(
+        parquet_path,
+        None,
+        filters=[("leaderboard_name", "==", "Hay")],
+        cache=ObjectCache(cache_dir=None),
+    )
+
+
+def main(days=90):
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = str(Path(tmp) / "over_time_ms.csv")
+        parquet_path = str(Path(tmp) / "over_time_ms.parquet")
+        df = make_over_time(days)
+        df.to_csv(csv_path, index=False)
+        write_parquet(df, parquet_path, time_cols=["time"])
+
+        print(f"rows: {len(df):,}")
+        print(f"csv size:     {Path(csv_path).stat().st_size / 2**20:8.1f} MiB")
+        print(f"parquet size: {Path(parquet_path).stat().st_size / 2**20:8.1f} MiB")
+        cases = [
+            ("csv", _read_csv, csv_path),
+            ("parquet", _read_parquet, parquet_path),
+            ("parquet, one board", _read_parquet_one_board, parquet_path),
+        ]
+        for label, fn, path in cases:
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_measure, args=(label, _Call(fn, path), queue))
+            proc.start()
+            label, elapsed, peak_mib, rows = queue.get()
+            proc.join()
+            print(f"{label:20s} {elapsed:7.3f}s  peak {peak_mib:7.1f} MiB  {rows:,} rows")
+
+
+class _Call:
+    # Picklable fn(path) closure for spawned workers
+    def __init__(self, fn, path):
+        self.fn, self.path = fn, path
+
+    def __call__(self):
+        return self.fn(self.path)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 90)
@@ -0,0 +1,145 @@
+"""End-to-end benchmark of the app's stages on synthetic data, without a browser.
+
+Writes a synthetic dataset to a temporary directory, loads it through local
+``file://`` URLs with the same store the app uses, and times every stage a page
+render goes through. Prints one JSON document (also written to ``--out``), so
+results can be tracked over time:
+
+    python -m benchmarks.run --days 30 --entries 5000 --out bench.json
+
+Stages run with profiling forced on, so each stage also lists the sections
+(download, CSV parse, datetime parse, ...) it spent its time in.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import LEADERBOARDS, write_dataset
+from utils.altair_charts import ChartDataError, over_time_chart_spec
+from utils.constants import HISTORY_DEFAULT_WINDOW, HISTORY_WINDOWS
+from utils.fetch import ObjectCache
+from utils.overview import build_overview
+from utils.profiling import run
+from utils.store import DataStore
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _stage(results, name, fn, repeat=1):
+    """Run ``fn`` ``repeat`` times; records the best wall time and the last run's sections."""
+    best = None
+    for _ in range(repeat):
+        with run(force=True) as records:
+            start = time.perf_counter()
+            value = fn()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    sections = {}
+    for record in records:
+        totals = sections.setdefault(record["section"], {"count": 0, "seconds": 0.0})
+        totals["count"] += 1
+        totals["seconds"] += record["seconds"]
+    results.append({"stage": name, "seconds": best, "repeat": repeat, "sections": sections})
+    return value
+
+
+def benchmark(days, entries, parquet=False, repeat=5):
+    # Imported here: main.py is the Streamlit script and imports streamlit
+    import main as app
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        urls = write_dataset(directory, days, entries, parquet=parquet)
+        store = DataStore(urls=urls, cache=ObjectCache(cache_dir=None))
+        # As a board page does: every refresh loads the history too
+        store.history_wanted = True
+        data = _stage(results, "store.refresh.cold", store.refresh)
+        _stage(results, "store.refresh.unchanged", store.refresh, repeat)
+
+    _stage(
+        results,
+        "get_last_updated",
+        lambda: [app.get_last_updated(data, name) for name in LEADERBOARDS],
+        repeat,
+    )
+    _stage(
+        results,
+        "overview.build",
+        lambda: build_overview(data.snapshot, LEADERBOARDS, top_n=10),
+        repeat,
+    )
+    # What every rerun pays once the tables are built: the "ago" cells and the markdown
+    _stage(results, "overview.render", lambda: app.display_overview(store, data), repeat)
+    _stage(
+        results,
+        "leaderboard_page",
+        lambda: app.display_leaderboard_pages(store, data, LEADERBOARDS[0]),
+        repeat,
+    )
+
+    window_days = HISTORY_WINDOWS[HISTORY_DEFAULT_WINDOW]
+    chart_data = _stage(
+        results,
+        "history_chart.prepare",
+        lambda: app.load_history_chart_data(store, data, window_days),
+    )
+    sizes = []
+
+    def build_specs():
+        sizes.clear()
+        for n, name in enumerate(LEADERBOARDS):
+            # A fresh data version per call so the spec cache never answers
+            spec = over_time_chart_spec(chart_data, name, (time.perf_counter_ns(), n))
+            if not isinstance(spec, ChartDataError):
+                sizes.append(len(json.dumps(spec)))
+
+    _stage(results, "history_chart.spec", build_specs, repeat)
+    results[-1]["spec_bytes"] = {"max": max(sizes, default=0), "total": sum(sizes)}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=30, help="days of history")
+    parser.add_argument("--entries", type=int, default=5000, help="entries per leaderboard")
+    parser.add_argument("--parquet", action="store_true", help="also publish Parquet copies")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per warm stage (best kept)")
+    parser.add_argument("--out", help="also write the JSON result here")
+    args = parser.parse_args(argv)
+
+    report = {
+        "timestamp": pd.Timestamp.now(tz="UTC").isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "params": {
+            "days": args.days,
+            "entries_per_board": args.entries,
+            "leaderboards": len(LEADERBOARDS),
+            "parquet": args.parquet,
+        },
+        "stages": benchmark(args.days, args.entries, args.parquet, args.repeat),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,93 @@
+"""Synthetic leaderboard data shaped like the published S3 files."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.constants import TABS
+from utils.storage import csv_to_parquet
+from utils.store import urls_for
+
+LEADERBOARDS = TABS[1:]
+
+
+def make_snapshot(n_rows=1_000_000, seed=0):
+    """Fake ``gaps_latest_ms.csv``: ranked entries spread over every leaderboard."""
+    rng = np.random.default_rng(seed)
+    board = rng.integers(0, len(LEADERBOARDS), n_rows)
+    duration = rng.lognormal(mean=13, sigma=1.2, size=n_rows).astype("int64")
+
+    df = pd.DataFrame(
+        {
+            "leaderboard_name": np.asarray(LEADERBOARDS, dtype=object)[board],
+            "steam_name": np.char.add("player_", rng.integers(0, n_rows, n_rows).astype(str)),
+            "duration_ms": duration,
+        }
+    )
+    df = df.sort_values(["leaderboard_name", "duration_ms"], ignore_index=True)
+    grouped = df.groupby("leaderboard_name", sort=False)["duration_ms"]
+    df["rank"] = grouped.cumcount() + 1
+    df["gap_prev_ms"] = grouped.diff()
+    df["gap_leader_ms"] = df["duration_ms"] - grouped.transform("min")
+
+    now = pd.Timestamp.now(tz="UTC")
+    age_s = rng.integers(0, 365 * 86400, n_rows)
+    df["achieved_at"] = now - pd.to_timedelta(age_s, unit="s")
+    return df
+
+
+def make_over_time(days=90, interval_minutes=5, seed=0):
+    """Fake ``over_time_ms.csv``: Top 1/2/3/10/100 per leaderboard per scrape."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(
+        end=pd.Timestamp.now(tz="UTC").floor("min"),
+        periods=days * 24 * 60 // interval_minutes,
+        freq=f"{interval_minutes}min",
+    )
+    frames = []
+    for name in LEADERBOARDS:
+        # records only ever improve, in occasional steps
+        steps = rng.random(len(times)) < 0.002
+        improvement = np.where(steps, rng.uniform(0.9, 0.99, len(times)), 1.0)
+        top_1 = rng.lognormal(mean=11, sigma=1.0) * np.cumprod(improvement)
+        frame = pd.DataFrame({"time": times, "leaderboard_name": name})
+        for n, factor in [(1, 1.0), (2, 1.05), (3, 1.1), (10, 1.4), (100, 3.0)]:
+            frame[f"top_{n}_ms"] = (top_1 * factor).astype("int64")
+        frames.append(frame)
+    return pd.concat(frames).sort_values("time", kind="stable", ignore_index=True)
+
+
+def make_percentiles(snapshot):
+    """``percentiles.csv`` computed from a snapshot made by ``make_snapshot``."""
+    grouped = snapshot.groupby("leaderboard_name")["duration_ms"]
+    df = grouped.quantile([0.01, 0.10, 0.25, 0.50]).unstack()
+    df.columns = ["p1_ms", "p10_ms", "p25_ms", "p50_ms"]
+    df = df.round().astype("int64")
+    df["entry_count"] = grouped.size()
+    return df.reset_index()
+
+
+def write_dataset(directory, days=30, entries_per_board=5000, seed=0, parquet=False):
+    """Write the three published files under ``directory``.
+
+    Returns ``{name: (csv_url, parquet_url)}`` with local ``file://`` URLs, in
+    the shape ``utils.store.DataStore`` takes. Parquet copies are only written
+    when ``parquet`` is set; otherwise the Parquet URLs point at missing files
+    and the loaders fall back to CSV.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    snapshot = make_snapshot(entries_per_board * len(LEADERBOARDS), seed)
+    frames = {
+        "over_time": (make_over_time(days, seed=seed), ["time"]),
+        "gaps_latest": (snapshot, ["achieved_at"]),
+        "percentiles": (make_percentiles(snapshot), []),
+    }
+    urls = urls_for(directory.resolve().as_uri())
+    for name, (df, time_cols) in frames.items():
+        csv_url, parquet_url = urls[name]
+        df.to_csv(directory / csv_url.rsplit("/", 1)[1], index=False)
+        if parquet:
+            csv_to_parquet(csv_url, parquet_url, time_cols)
+    return urls
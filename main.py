@@ -2,21 +2,30 @@ import pandas as pd
 import streamlit as st
 
 
-from utils.altair_charts import display_over_time_chart
 from utils.constants import (
-    OVER_TIME_S3,
-    GAPS_LATEST_S3,
-    PERCENTILES_S3,
+    HISTORY_WINDOWS,
+    HISTORY_DEFAULT_WINDOW,
     TABS,
     COLORS,
     EMOJIS,
     DEFAULT_COLOR,
+    LEADERBOARD_PAGE_SIZE,
 )
-from utils.typing import (
-    gap_ms_to_str,
-    ms_to_str,
-)
-from utils.prettify import series_human_friendly_time, format_delta
+from utils.rollups import build_rollups
+from utils.partition import rank_range, top_by_rank
+from utils.overview import build_overview
+from utils.players import PlayerIndex
+from utils.ranks import DurationIndex
+from utils.records import build_record_events, record_summary
+from utils.store import DataStore
+from utils.typing import ms_to_str, series_ms_to_str, str_to_ms
+from utils.prettify import format_delta, series_human_friendly_time, with_time_ago
+from utils.profiling import metrics, section, start_run, timed
+from utils.fetch import object_cache
+from utils.timestamps import malformed_counts
+
+# Sidebar pages: the Overview, the comparison view, then one page per board
+PAGES = TABS[:1] + ["Compare"] + TABS[1:]
 
 
 def get_leaderboard_color(leaderboard_name):
@@ -27,45 +36,85 @@ def get_emoji(leaderboard_name):
     return EMOJIS.get(leaderboard_name.split()[0], ":man_farmer:")
 
 
-@st.cache_data(ttl=300)
-def load_over_time():
-    df = pd.read_csv(OVER_TIME_S3)
-    df["time"] = pd.to_datetime(
-        df["time"], format="mixed", errors="coerce", utc=True
+@st.cache_resource
+def get_store():
+    # One store per process, shared by every session without copying
+    store = DataStore()
+    store.on_history(warm_history)
+    store.start()
+    return store
+
+
+def load_history_rollups(store, data):
+    return store.derive("rollups", data.history_version, lambda: build_rollups(data.over_time))
+
+
+def load_history_chart_data(store, data, window_days, hide_top_100=True):
+    # Altair is only imported once a board page needs a chart
+    from utils.altair_charts import prepare_all_over_time_data
+
+    # Built once per history version for every board, then shared
+    return store.derive(
+        ("history_chart", window_days, hide_top_100),
+        data.history_version,
+        lambda: prepare_all_over_time_data(
+            data.over_time, window_days, hide_top_100, load_history_rollups(store, data)
+        ),
+    )
+
+
+def load_record_events(store, data):
+    # Over the full history, once per history version
+    return store.derive("records", data.history_version, lambda: build_record_events(data.over_time))
+
+
+def load_comparison_data(store, data, window_days):
+    from utils.altair_charts import prepare_comparison_data
+
+    return store.derive(
+        ("compare", window_days),
+        data.history_version,
+        lambda: prepare_comparison_data(
+            data.over_time, window_days, load_history_rollups(store, data)
+        ),
     )
-    return df, get_last_updated(df)
 
 
-@st.cache_data(ttl=300)
-def load_gaps_latest():
-    df = pd.read_csv(GAPS_LATEST_S3)
-    df["achieved_at"] = pd.to_datetime(
-        df["achieved_at"], format="mixed", errors="coerce", utc=True
+def load_player_index(store, data):
+    return store.derive("players", data.snapshot_version, lambda: PlayerIndex(data.snapshot))
+
+
+def load_duration_index(store, data):
+    return store.derive("durations", data.snapshot_version, lambda: DurationIndex(data.snapshot))
+
+
+def load_overview(store, data):
+    return store.derive(
+        "overview", data.snapshot_version, lambda: build_overview(data.snapshot, TABS[1:], top_n=10)
     )
-    return df
 
 
-@st.cache_data(ttl=300)
-def load_percentiles():
-    df = pd.read_csv(PERCENTILES_S3)
-    records = df.to_dict(orient="records")
-    data = {r["leaderboard_name"]: r for r in records}
-    return data
+def warm_history(store, data):
+    # Build what the board and Compare pages show first in the refresher thread,
+    # not on the request path of whichever session asks first
+    window_days = HISTORY_WINDOWS[HISTORY_DEFAULT_WINDOW]
+    load_history_chart_data(store, data, window_days)
+    load_comparison_data(store, data, window_days)
+    load_record_events(store, data)
 
 
-def get_last_updated(df_over_time):
-    last_updated_ts = df_over_time.groupby('leaderboard_name')['time'].max().to_dict()
+def get_last_updated(data, leaderboard_name):
+    ts = data.last_updated.get(leaderboard_name)
+    if ts is None or pd.isna(ts):
+        return "unknown"
     now = pd.to_datetime('now', utc=True)
-    last_updated = {k: f'{ts} ({format_delta(now-ts)} ago)' for k, ts in last_updated_ts.items()}
-    return last_updated
+    return f'{data.last_updated_text[leaderboard_name]} ({format_delta(now-ts)} ago)'
 
 
-def display_top3(df_snapshot, leaderboard_name):
+@timed("display.top3")
+def display_top3(snapshot, leaderboard_name):
     top_n = 3
-    condition = (df_snapshot["leaderboard_name"] == leaderboard_name) & (
-        df_snapshot["rank"] <= top_n
-    )
-    records = df_snapshot[condition].sort_values("rank").to_dict(orient="records")
+    records = top_by_rank(snapshot[leaderboard_name], top_n).to_dict(orient="records")
 
     boxes = st.columns(top_n)
     icons = ["🥇", "🥈", "🥉"]
@@ -74,6 +123,7 @@ def display_top3(df_snapshot, leaderboard_name):
             info_box(icon, info["steam_name"], ms_to_str(info["duration_ms"]))
 
 
+@timed("display.percentiles")
 def display_percentiles(percentiles):
     fields = [k for k in percentiles if k.startswith("p") and k.endswith("_ms")]
     boxes = st.columns(len(fields) + 1)
@@ -92,21 +142,212 @@ def display_percentiles(percentiles):
         )
 
 
-def display_leaderboard(df_leaderboard, leaderboard_name, top_n=100, height=1600):
-    condition = (df_leaderboard["leaderboard_name"] == leaderboard_name) & (
-        df_leaderboard["rank"] <= top_n
+@timed("display.rank_calculator")
+def display_rank_calculator(store, data):
+    st.header(":stopwatch: What Rank Would My Time Get?")
+    text = st.text_input("Time (mm:ss.mmm)", key="rank_calculator_time")
+    if not text:
+        return
+    duration_ms = str_to_ms(text)
+    if duration_ms is None:
+        st.warning(f"Could not read '{text}' as a time, expected e.g. 01:23.456")
+        return
+    ranks = load_duration_index(store, data).ranks_for(duration_ms, TABS[1:])
+    table = pd.DataFrame({
+        "Leaderboard": ranks["leaderboard_name"],
+        "Rank": ranks["rank"].astype("Int64"),
+        "Top %": ranks["top_pct"].map(lambda p: "" if pd.isna(p) else f"{p:.2f}%"),
+        "Entries": ranks["entries"],
+    })
+    st.table(table.set_index("Leaderboard"))
+
+
+@timed("display.custom_percentile")
+def display_custom_percentile(durations, leaderboard_name):
+    pct = st.number_input(
+        "Top % cutoff", min_value=0.01, max_value=100.0, value=5.0, step=0.5,
+        key=f"custom_percentile_{leaderboard_name}",
     )
+    time = ms_to_str(durations.percentile(leaderboard_name, pct))
+    st.metric(f"Top {pct:g}%", time or "-", delta=None, border=True)
 
-    df_leaderboard["Time"] = df_leaderboard["duration_ms"].apply(ms_to_str)
-    df_leaderboard["Gap"] = df_leaderboard["gap_prev_ms"].apply(gap_ms_to_str)
-    df_leaderboard["Gap To Leader"] = df_leaderboard["gap_leader_ms"].apply(
-        gap_ms_to_str
-    )
-    df_leaderboard["Date"] = series_human_friendly_time(df_leaderboard["achieved_at"])
 
+def _display_leaderboard_rows(df_leaderboard):
     out_cols = ["rank", "steam_name", "Time", "Gap", "Gap To Leader", "Date"]
     column_renames = {"rank": "Rank", "steam_name": "Player"}
-    st.table(df_leaderboard[condition][out_cols].rename(columns=column_renames).set_index('Rank'))
+    with section("st.table") as stats:
+        rows = with_time_ago(df_leaderboard)[out_cols]
+        st.table(rows.rename(columns=column_renames).set_index('Rank'))
+        stats["rows"] = len(df_leaderboard)
+
+
+def _jump_to_rank(page_key, rank_key, page_size):
+    rank = st.session_state[rank_key]
+    if rank is not None:
+        st.session_state[page_key] = (int(rank) - 1) // page_size + 1
+
+
+def _jump_to_player(page_key, player_key, page_size, board, store, data, leaderboard_name):
+    query = st.session_state[player_key]
+    players = load_player_index(store, data)
+    # Exact name first, then the first prefix match that is on this board
+    for name in [query.strip()] + players.search(query, limit=50):
+        position = players.position(name, leaderboard_name)
+        if position is not None:
+            rank = int(board["rank"].iloc[position])
+            st.session_state[page_key] = (rank - 1) // page_size + 1
+            return
+    st.toast(f"No player matching '{query}' on {leaderboard_name}")
+
+
+@timed("display.leaderboard_pages")
+def display_leaderboard_pages(store, data, leaderboard_name, page_size=LEADERBOARD_PAGE_SIZE):
+    # Only one page of rows is ever rendered, however long the board is
+    board = data.snapshot[leaderboard_name]
+    last_rank = int(board["rank"].iloc[-1]) if len(board) else 1
+    n_pages = max((last_rank - 1) // page_size + 1, 1)
+    page_key = f"leaderboard_page_{leaderboard_name}"
+    rank_key = f"leaderboard_rank_{leaderboard_name}"
+    player_key = f"leaderboard_player_{leaderboard_name}"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+
+    page_col, rank_col, player_col = st.columns(3)
+    with page_col:
+        page = st.number_input(f"Page (of {n_pages})", 1, n_pages, key=page_key)
+    with rank_col:
+        st.number_input(
+            "Jump to rank", 1, last_rank, value=None, key=rank_key,
+            on_change=_jump_to_rank, args=(page_key, rank_key, page_size),
+        )
+    with player_col:
+        st.text_input(
+            "Jump to player", key=player_key, on_change=_jump_to_player,
+            args=(page_key, player_key, page_size, board, store, data, leaderboard_name),
+        )
+
+    first = (page - 1) * page_size + 1
+    _display_leaderboard_rows(rank_range(board, first, first + page_size - 1))
+
+
+@timed("display.history")
+def display_history(store, leaderboard_name):
+    from utils.altair_charts import display_over_time_chart
+
+    window = st.segmented_control(
+        "Window",
+        list(HISTORY_WINDOWS),
+        default=HISTORY_DEFAULT_WINDOW,
+        key="history_window",
+        label_visibility="collapsed",
+    ) or HISTORY_DEFAULT_WINDOW
+    window_days = HISTORY_WINDOWS[window]
+    # The full history is loaded the first time any board page is opened
+    data = store.history_data()
+    chart_data = load_history_chart_data(store, data, window_days)
+    display_over_time_chart(
+        chart_data,
+        leaderboard_name,
+        (window_days, data.history_version),
+        hide_top_100=True,
+    )
+
+
+@timed("display.records")
+def display_records(store, leaderboard_name):
+    from utils.altair_charts import display_record_progression
+
+    data = store.history_data()
+    events = load_record_events(store, data)
+    display_record_progression(events, leaderboard_name, data.history_version)
+
+    with st.expander("All leaderboards"):
+        summary = record_summary(events)
+        if summary.empty:
+            st.info("No records yet.")
+            return
+        table = pd.DataFrame({
+            "Leaderboard": summary["leaderboard_name"],
+            "Record": series_ms_to_str(summary["record_ms"]),
+            "Set": series_human_friendly_time(summary["set_at"]),
+            "Held (days)": summary["held_days"].round(1),
+            "Records": summary["records"],
+            "Improved since first": summary["total_improvement_pct"].map("{:.1f}%".format),
+            "Days between records": summary["mean_days_between"].round(1),
+        })
+        st.table(table.set_index("Leaderboard"))
+
+
+@timed("display.compare")
+def display_compare(store):
+    from utils.altair_charts import display_comparison_chart
+
+    boards = TABS[1:]
+    names = st.multiselect(
+        "Leaderboards", boards, default=["Hay", "Hay Single"], key="compare_boards"
+    )
+    window = st.segmented_control(
+        "Window",
+        list(HISTORY_WINDOWS),
+        default=HISTORY_DEFAULT_WINDOW,
+        key="compare_window",
+        label_visibility="collapsed",
+    ) or HISTORY_DEFAULT_WINDOW
+    if not names:
+        st.info("Pick one or more leaderboards to compare.")
+        return
+    data = store.history_data()
+    prepared = load_comparison_data(store, data, HISTORY_WINDOWS[window])
+    # Keep the order of the tabs so a selection always maps to the same cached spec
+    names = [n for n in boards if n in names]
+    display_comparison_chart(prepared, names, (window, data.history_version))
+    st.caption("Each board's Top 1 relative to its current record (100%).")
+
+
+@timed("display.movers")
+def display_movers(movers, limit=20):
+    movers = movers.head(limit)
+    if movers.empty:
+        return
+    labels = {"record": "New record", "new": "New entry", "improved": "Improved", "rank_up": "Moved up"}
+    table = pd.DataFrame({
+        "Leaderboard": movers["leaderboard_name"],
+        "Player": movers["steam_name"],
+        "Change": movers["event"].map(labels),
+        "Rank": movers["rank"].astype("Int64"),
+        "Was": movers["prev_rank"].astype("Int64"),
+        "Time": series_ms_to_str(movers["duration_ms"]),
+        "Seen": series_human_friendly_time(movers["detected_at"]),
+    })
+    st.header(":chart_with_upwards_trend: Recent Changes")
+    st.table(table.set_index("Leaderboard"))
+    st.divider()
+
+
+@timed("display.player")
+def display_player(players, player_name):
+    profile = players.profile(player_name, order=TABS)
+    if profile.empty:
+        st.info(f"No entries for {player_name}.")
+        return
+
+    records = profile.to_dict(orient="records")
+    per_row = 4
+    for start in range(0, len(records), per_row):
+        boxes = st.columns(per_row)
+        for box, info in zip(boxes, records[start:start + per_row]):
+            with box:
+                info_box(
+                    f"#{info['rank']}",
+                    info["leaderboard_name"],
+                    ms_to_str(info["duration_ms"]),
+                    color=get_leaderboard_color(info["leaderboard_name"]),
+                )
+    st.divider()
+
+    out_cols = ["leaderboard_name", "rank", "Time", "Gap", "Gap To Leader", "Date"]
+    column_renames = {"leaderboard_name": "Leaderboard", "rank": "Rank"}
+    st.table(with_time_ago(profile)[out_cols].rename(columns=column_renames).set_index('Leaderboard'))
 
 
 def info_box(icon, name, time, color="#262730"):
@@ -129,22 +370,53 @@ def info_box(icon, name, time, color="#262730"):
     )
 
 
-def display_last_updated(last_updated_string):
-    st.markdown(
-        f"""
-        <div style="text-align:left; color:gray; font-size:0.8rem; margin-top:2rem;">
-            Last updated: {last_updated_string}
-        </div>
-        """,
-        unsafe_allow_html=True
+def last_updated_html(data, leaderboard_name):
+    return (
+        '<div style="text-align:left; color:gray; font-size:0.8rem; margin-top:2rem;">'
+        f"Last updated: {get_last_updated(data, leaderboard_name)}<br>"
+        f"Data checked {format_delta(data.age())} (refresh took {data.refresh_seconds:.1f}s)"
+        "</div>"
     )
 
 
+def display_last_updated(data, leaderboard_name):
+    st.markdown(last_updated_html(data, leaderboard_name), unsafe_allow_html=True)
+
+
+@timed("display.overview")
+def display_overview(store, data):
+    # Tables are prebuilt per data version; only the last-updated lines change per rerun
+    parts = []
+    for leaderboard_name, table in load_overview(store, data):
+        parts += [
+            f"## {get_emoji(leaderboard_name)} {leaderboard_name} Top 10",
+            table.html(),
+            last_updated_html(data, leaderboard_name),
+            "---",
+        ]
+    st.markdown("\n\n".join(parts), unsafe_allow_html=True)
+
+
+def display_profile(records, store):
+    # Debug panel for ?profile=1
+    with st.sidebar.expander("Profile", expanded=True):
+        st.caption("This run")
+        st.dataframe(pd.DataFrame(records, columns=["section", "seconds", "rows", "bytes"]))
+        st.caption("Last profiled refresh")
+        st.dataframe(pd.DataFrame(store.last_refresh_profile, columns=["section", "seconds", "rows", "bytes"]))
+        st.caption("Object cache")
+        st.json(object_cache.stats)
+        st.caption("Malformed timestamps")
+        st.json({f"{source} {column}": n for (source, column), n in malformed_counts().items()})
+        st.caption("Counters")
+        st.code(metrics.prometheus(), language="text")
+
+
 def _get_query_leaderboard():
     leaderboards = st.query_params.get_all('leaderboard')
     lb = leaderboards[0] if leaderboards else 'Overview'
 
-    if lb in TABS:
+    if lb in PAGES:
         return lb
     else:
         return 'Overview'
@@ -154,21 +426,36 @@ def _set_query_leaderboard(value: str):
     st.query_params.from_dict({'leaderboard': value})
 
 
+def _get_query_player(store, data):
+    player = st.query_params.get('player')
+    if player is None:
+        return None
+    return player if player in load_player_index(store, data) else None
+
+
+def _set_query_player(value: str):
+    st.query_params.from_dict({'player': value})
+
+
 def main():
     st.set_page_config("TFWR Leaderboards", ":trophy:")
     st.set_page_config(layout="wide")
 
-    df_over_time, last_updated = load_over_time()
-    df_snapshot = load_gaps_latest()
-    df_percentiles = load_percentiles()
-
+    profiling = 'profile' in st.query_params
+    records = start_run(force=profiling)
     # Initialize from query param if provided
     qp_selected = _get_query_leaderboard()
     st.session_state.selected_leaderboard = qp_selected
+
+    store = get_store()
+    # Board pages chart the history: load it with everything else in one refresh
+    data = store.data if qp_selected == 'Overview' else store.history_data()
+    snapshot = data.snapshot
+    df_percentiles = data.percentiles
     with st.sidebar:
         st.write("The Farmer Was Replaced Leaderboards")
 
-        for name in TABS:
+        for name in PAGES:
             is_active = name == st.session_state.selected_leaderboard 
             button_name = f"{get_emoji(name)} {name}"
             if st.button(
@@ -181,29 +468,47 @@ def main():
                 _set_query_leaderboard(name)
                 st.rerun()
 
+        st.divider()
+        query = st.text_input("Find a player", key="player_search")
+        for name in load_player_index(store, data).search(query) if query else []:
+            if st.button(name, use_container_width=True, key=f"player_{name}"):
+                _set_query_player(name)
+                st.rerun()
+
+    selected_player = _get_query_player(store, data)
     selected_leaderboard = st.session_state.selected_leaderboard
-    if selected_leaderboard == 'Overview':
-        for leaderboard_name in TABS[1:]:
-            st.header(f"{get_emoji(leaderboard_name)} {leaderboard_name} Top 10")
-            display_leaderboard(df_snapshot, leaderboard_name, top_n=10, height='auto')
-            display_last_updated(last_updated[leaderboard_name])
-            st.divider()
+    if selected_player is not None:
+        st.header(f":bust_in_silhouette: {selected_player}")
+        display_player(load_player_index(store, data), selected_player)
+    elif selected_leaderboard == 'Compare':
+        st.header(f"{get_emoji('Compare')} Compare Leaderboards")
+        display_compare(store)
+    elif selected_leaderboard == 'Overview':
+        display_movers(data.movers)
+        display_rank_calculator(store, data)
+        st.divider()
+        display_overview(store, data)
     else:
         st.header(f"{get_emoji(selected_leaderboard)} {selected_leaderboard} Leaderboards")
-        display_top3(df_snapshot, selected_leaderboard)
+        display_top3(snapshot, selected_leaderboard)
         st.divider()
 
         display_percentiles(df_percentiles[selected_leaderboard])
+        display_custom_percentile(load_duration_index(store, data), selected_leaderboard)
         st.divider()
 
         st.subheader("Leaderboard History")
-        display_over_time_chart(
-            df_over_time, selected_leaderboard, hide_top_100=True
-        )
+        display_history(store, selected_leaderboard)
+
+        st.subheader("Record Progression")
+        display_records(store, selected_leaderboard)
 
         st.subheader("Leaderboard")
-        display_leaderboard(df_snapshot, selected_leaderboard)
-        display_last_updated(last_updated[selected_leaderboard])
+        display_leaderboard_pages(store, data, selected_leaderboard)
+        display_last_updated(data, selected_leaderboard)
+
+    if profiling:
+        display_profile(records, store)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def publish():
+    """Write ``data`` to ``path`` as a new object version (a later mtime)."""
+
+    def publish(path, data, append=False):
+        # Bump the mtime explicitly: rewrites can land within the filesystem's resolution
+        mtime = path.stat().st_mtime_ns + 10**9 if path.exists() else None
+        with open(path, "ab" if append else "wb") as f:
+            f.write(data)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+
+    return publish
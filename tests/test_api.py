@@ -0,0 +1,41 @@
+import asyncio
+
+from api import create_app
+from utils.profiling import metrics
+
+
+def get(app, path):
+    """Send one GET through the ASGI app: (status, headers, body)."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []}
+    asyncio.run(app(scope, receive, send))
+    start, body = sent
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+def test_metrics_serves_prometheus_text():
+    metrics.add({"section": "load.test", "seconds": 0.5, "rows": 3, "bytes": None})
+    status, headers, body = get(create_app("file:///nonexistent"), "/metrics")
+    assert status == 200
+    assert headers[b"content-type"].startswith(b"text/plain")
+    assert b'tfwr_section_rows_total{section="load.test"}' in body
+
+
+def test_unknown_path_is_json_404():
+    status, headers, _ = get(create_app("file:///nonexistent"), "/nope")
+    assert status == 404
+    assert headers[b"content-type"] == b"application/json"
+
+
+def test_path_is_not_decoded_twice():
+    # "/leaderboards/Hay%2541/top" arrives decoded once as "Hay%41", not "HayA"
+    status, _, body = get(create_app("file:///nonexistent"), "/leaderboards/Hay%41/top")
+    assert status == 404
+    assert b"Hay%41" in body
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from utils.derive import build
+
+
+@pytest.fixture
+def entries(tmp_path):
+    path = tmp_path / "entries.csv"
+    pd.DataFrame({
+        "leaderboard_name": ["Hay", "Hay", "Hay", "Wood"],
+        "steam_name": ["a", "b", "c", "a"],
+        "duration_ms": [3000, 1000, 2000, 5000],
+        "achieved_at": ["2026-01-01 00:00:00+00:00"] * 4,
+    }).to_csv(path, index=False)
+    return path
+
+
+def read_history(out):
+    return pd.read_csv(out / "over_time_ms.csv")
+
+
+def test_build_creates_then_appends(entries, tmp_path):
+    out = tmp_path / "out"
+    build(entries.as_uri(), out.as_uri(), "2026-01-01 00:00")
+    build(entries.as_uri(), out.as_uri(), "2026-01-01 00:05")
+
+    history = read_history(out)
+    assert history["time"].tolist() == ["2026-01-01 00:00:00+00:00"] * 2 + ["2026-01-01 00:05:00+00:00"] * 2
+    assert history[history["leaderboard_name"] == "Hay"]["top_1_ms"].tolist() == [1000, 1000]
+    snapshot = pd.read_csv(out / "gaps_latest_ms.csv")
+    assert snapshot[snapshot["leaderboard_name"] == "Hay"]["rank"].tolist() == [1, 2, 3]
+
+
+def test_build_follows_the_existing_column_order(entries, tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    columns = ["leaderboard_name", "time", "top_100_ms", "top_10_ms", "top_3_ms", "top_2_ms", "top_1_ms"]
+    (out / "over_time_ms.csv").write_text(
+        ",".join(columns) + "\nHay,2025-12-31 00:00:00+00:00,,,3000,2000,1000\n"
+    )
+    build(entries.as_uri(), out.as_uri(), "2026-01-01 00:00")
+
+    history = read_history(out)
+    assert list(history.columns) == columns
+    hay = history[history["leaderboard_name"] == "Hay"]
+    assert hay["top_1_ms"].tolist() == [1000, 1000]
+    assert hay["top_3_ms"].tolist() == [3000, 3000]
+    assert hay["time"].iloc[-1] == "2026-01-01 00:00:00+00:00"
+
+
+def test_build_refuses_other_columns(entries, tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    published = b"time,leaderboard_name,top_1_ms\n2025-12-31 00:00:00+00:00,Hay,1000\n"
+    (out / "over_time_ms.csv").write_bytes(published)
+    with pytest.raises(ValueError, match="columns"):
+        build(entries.as_uri(), out.as_uri(), "2026-01-01 00:00")
+    assert (out / "over_time_ms.csv").read_bytes() == published
+    assert not (out / "gaps_latest_ms.csv").exists()
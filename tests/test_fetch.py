@@ -0,0 +1,80 @@
+import pytest
+
+from utils.fetch import ObjectCache
+
+
+@pytest.fixture
+def obj(tmp_path):
+    path = tmp_path / "data" / "object.csv"
+    path.parent.mkdir()
+    path.write_bytes(b"a,b\n1,2\n")
+    return path
+
+
+def counting_parse():
+    calls = []
+
+    def parse(data):
+        calls.append(data)
+        return data.decode()
+
+    return parse, calls
+
+
+def test_miss_then_hit(obj, tmp_path):
+    cache = ObjectCache(cache_dir=tmp_path / "cache")
+    parse, calls = counting_parse()
+    first = cache.get(obj.as_uri(), parse)
+    second = cache.get(obj.as_uri(), parse)
+    assert first == second == "a,b\n1,2\n"
+    assert second is first
+    assert len(calls) == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["hits"] == 1
+    assert cache.stats["bytes_transferred"] == len(b"a,b\n1,2\n")
+
+
+def test_changed_object_is_downloaded_again(obj, tmp_path, publish):
+    cache = ObjectCache(cache_dir=tmp_path / "cache")
+    parse, calls = counting_parse()
+    cache.get(obj.as_uri(), parse)
+    publish(obj, b"a,b\n3,4\n")
+    assert cache.get(obj.as_uri(), parse) == "a,b\n3,4\n"
+    assert len(calls) == 2
+    assert cache.stats["misses"] == 2
+
+
+def test_parsed_results_are_kept_per_key(obj, tmp_path):
+    cache = ObjectCache(cache_dir=None)
+    assert cache.get(obj.as_uri(), len, key="len") == 8
+    assert cache.get(obj.as_uri(), bytes.upper, key="upper") == b"A,B\n1,2\n"
+    assert cache.stats["misses"] == 2
+
+
+def test_disk_hit_after_restart(obj, tmp_path):
+    ObjectCache(cache_dir=tmp_path / "cache").get(obj.as_uri(), bytes.decode)
+    restarted = ObjectCache(cache_dir=tmp_path / "cache")
+    assert restarted.get(obj.as_uri(), bytes.decode) == "a,b\n1,2\n"
+    assert restarted.stats["disk_hits"] == 1
+    assert restarted.stats["misses"] == 0
+    assert restarted.stats["bytes_transferred"] == 0
+
+
+def test_stale_disk_copy_is_not_used(obj, tmp_path, publish):
+    ObjectCache(cache_dir=tmp_path / "cache").get(obj.as_uri(), bytes.decode)
+    publish(obj, b"a,b\n3,4\n")
+    restarted = ObjectCache(cache_dir=tmp_path / "cache")
+    assert restarted.get(obj.as_uri(), bytes.decode) == "a,b\n3,4\n"
+    assert restarted.stats["disk_hits"] == 0
+    assert restarted.stats["misses"] == 1
+
+
+def test_ranged_cat(obj):
+    cache = ObjectCache(cache_dir=None)
+    assert cache.cat(obj.as_uri(), start=4, end=7) == b"1,2"
+    assert cache.stats["bytes_transferred"] == 3
+
+
+def test_missing_object(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ObjectCache(cache_dir=None).get((tmp_path / "missing.csv").as_uri(), bytes.decode)
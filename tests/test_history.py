@@ -0,0 +1,170 @@
+import pandas as pd
+import pytest
+
+from utils.fetch import ObjectCache
+from utils.history import IncrementalHistory, LatestTimestamps
+from utils.storage import csv_to_parquet
+
+HEADER = b"time,leaderboard_name,top_1_ms\n"
+
+
+def rows(start, stop):
+    """Scrapes ``start``..``stop - 1``: one row per board, a minute apart."""
+    out = b""
+    for i in range(start, stop):
+        for board, base in [("Hay", 60_000), ("Wood", 90_000)]:
+            out += f"2026-01-01 00:{i:02d}:00+00:00,{board},{base - i}\n".encode()
+    return out
+
+
+@pytest.fixture
+def csv(tmp_path):
+    path = tmp_path / "data" / "over_time_ms.csv"
+    path.parent.mkdir()
+    path.write_bytes(HEADER + rows(0, 10))
+    return path
+
+
+def make_history(csv, cache_dir, parquet=None):
+    cache = ObjectCache(cache_dir=cache_dir)
+    parquet_url = parquet.as_uri() if parquet else None
+    return IncrementalHistory(csv.as_uri(), parquet_url, overlap=64, cache=cache), cache
+
+
+def board_minutes(history, board):
+    return history.partitions[board]["time"].dt.minute.tolist()
+
+
+def test_first_refresh_then_unchanged(csv, tmp_path):
+    history, cache = make_history(csv, tmp_path / "cache")
+    assert history.refresh() == "reloaded"
+    assert board_minutes(history, "Hay") == list(range(10))
+    assert history.last_updated["Wood"] == pd.Timestamp("2026-01-01 00:09", tz="UTC")
+
+    transferred = cache.stats["bytes_transferred"]
+    assert history.refresh() == "unchanged"
+    assert cache.stats["bytes_transferred"] == transferred
+
+
+def test_append_reads_only_the_tail(csv, tmp_path, publish):
+    history, cache = make_history(csv, tmp_path / "cache")
+    history.refresh()
+    previous = history.partitions["Hay"]
+    transferred = cache.stats["bytes_transferred"]
+
+    publish(csv, rows(10, 12), append=True)
+    assert history.refresh() == "appended"
+    assert board_minutes(history, "Hay") == list(range(12))
+    assert history.partitions["Wood"]["top_1_ms"].iloc[-1] == 90_000 - 11
+    # Only the overlap plus the new rows
+    assert cache.stats["bytes_transferred"] - transferred == 64 + len(rows(10, 12))
+    # Readers of the previous version are unaffected
+    assert len(previous) == 10
+
+
+def test_partial_trailing_line_waits_for_the_rest(csv, tmp_path, publish):
+    history, _ = make_history(csv, tmp_path / "cache")
+    history.refresh()
+    line = rows(10, 11)
+    publish(csv, line[:-10], append=True)
+    assert history.refresh() == "appended"
+    assert board_minutes(history, "Hay") == list(range(11))
+    assert board_minutes(history, "Wood") == list(range(10))
+
+    publish(csv, line[-10:], append=True)
+    assert history.refresh() == "appended"
+    assert board_minutes(history, "Wood") == list(range(11))
+    assert history.offset == csv.stat().st_size
+
+
+def test_shrunk_file_is_reloaded(csv, tmp_path, publish):
+    history, _ = make_history(csv, tmp_path / "cache")
+    history.refresh()
+    publish(csv, HEADER + rows(0, 5))
+    assert history.refresh() == "reloaded"
+    assert board_minutes(history, "Hay") == list(range(5))
+
+
+def test_rewritten_prefix_is_reloaded(csv, tmp_path, publish):
+    history, _ = make_history(csv, tmp_path / "cache")
+    history.refresh()
+    # Longer than before, but what was already parsed changed
+    publish(csv, HEADER + rows(0, 12).replace(b",Wood,", b",Maze,"))
+    assert history.refresh() == "reloaded"
+    assert "Wood" not in history.last_updated
+    assert board_minutes(history, "Maze") == list(range(12))
+
+
+def test_restart_resumes_from_the_local_copy(csv, tmp_path, publish):
+    make_history(csv, tmp_path / "cache")[0].refresh()
+    publish(csv, rows(10, 12), append=True)
+
+    history, cache = make_history(csv, tmp_path / "cache")
+    assert history.refresh() == "appended"
+    assert board_minutes(history, "Hay") == list(range(12))
+    assert cache.stats["bytes_transferred"] == 64 + len(rows(10, 12))
+
+
+def test_restart_ignores_a_local_copy_that_is_no_longer_a_prefix(csv, tmp_path, publish):
+    make_history(csv, tmp_path / "cache")[0].refresh()
+    publish(csv, HEADER + rows(0, 12).replace(b",Wood,", b",Maze,"))
+
+    history, _ = make_history(csv, tmp_path / "cache")
+    assert history.refresh() == "reloaded"
+    assert board_minutes(history, "Maze") == list(range(12))
+
+
+def test_restart_resumes_from_the_parquet_copy(csv, tmp_path, publish):
+    parquet = csv.with_suffix(".parquet")
+    csv_to_parquet(csv.as_uri(), parquet.as_uri(), ["time"])
+    publish(csv, rows(10, 12), append=True)
+
+    history, cache = make_history(csv, None, parquet)
+    assert history.refresh() == "appended"
+    assert board_minutes(history, "Hay") == list(range(12))
+    # The tail recorded in the Parquet metadata (256 bytes) plus the new rows
+    assert cache.stats["bytes_transferred"] == 256 + len(rows(10, 12))
+
+
+def test_restarts_from_the_parquet_copy_with_a_cache_dir(csv, tmp_path, publish):
+    parquet = csv.with_suffix(".parquet")
+    csv_to_parquet(csv.as_uri(), parquet.as_uri(), ["time"])
+    for stop in (12, 14):
+        publish(csv, rows(stop - 2, stop), append=True)
+        history, _ = make_history(csv, tmp_path / "cache", parquet)
+        assert history.refresh() == "appended"
+        assert board_minutes(history, "Hay") == list(range(stop))
+
+
+def test_restart_falls_back_when_the_local_copy_does_not_parse(csv, tmp_path):
+    history, cache = make_history(csv, tmp_path / "cache")
+    history.refresh()
+    cache.write_local(csv.as_uri(), "damaged", rows(3, 5))
+
+    history, _ = make_history(csv, tmp_path / "cache")
+    assert history.refresh() == "reloaded"
+    assert board_minutes(history, "Hay") == list(range(10))
+
+
+def test_stale_parquet_copy_is_not_resumed_from(csv, tmp_path, publish):
+    parquet = csv.with_suffix(".parquet")
+    csv_to_parquet(csv.as_uri(), parquet.as_uri(), ["time"])
+    publish(csv, HEADER + rows(0, 12).replace(b",Wood,", b",Maze,"))
+
+    history, _ = make_history(csv, None, parquet)
+    assert history.refresh() == "reloaded"
+    assert board_minutes(history, "Maze") == list(range(12))
+
+
+def test_latest_timestamps_from_the_tail(csv, publish):
+    cache = ObjectCache(cache_dir=None)
+    latest = LatestTimestamps(csv.as_uri(), tail_bytes=64, boards=["Hay", "Wood"], cache=cache)
+    last_updated = latest.refresh()
+    assert last_updated == {
+        "Hay": pd.Timestamp("2026-01-01 00:09", tz="UTC"),
+        "Wood": pd.Timestamp("2026-01-01 00:09", tz="UTC"),
+    }
+    assert latest.refresh() is last_updated
+
+    publish(csv, rows(10, 11), append=True)
+    assert latest.refresh()["Hay"] == pd.Timestamp("2026-01-01 00:10", tz="UTC")
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from utils.partition import rank_range, top_by_rank
+from utils.store import prepare_snapshot
+
+
+def snapshot(ranks):
+    n = len(ranks)
+    return pd.DataFrame({
+        "leaderboard_name": ["Hay"] * n,
+        "rank": ranks,
+        "steam_name": [f"player_{i}" for i in range(n)],
+        "duration_ms": [60_000 + 1000 * i for i in range(n)],
+        "gap_prev_ms": [float("nan")] + [1000.0] * (n - 1),
+        "gap_leader_ms": [1000 * i for i in range(n)],
+        "achieved_at": pd.Timestamp("2026-01-01", tz="UTC"),
+    })
+
+
+def test_rank_lookups():
+    board = prepare_snapshot(snapshot([1, 2, 3, 4, 5]))["Hay"]
+    assert top_by_rank(board, 3)["rank"].tolist() == [1, 2, 3]
+    assert rank_range(board, 2, 4)["rank"].tolist() == [2, 3, 4]
+    assert rank_range(board, 6, 10).empty
+
+
+def test_rows_without_a_rank_are_dropped():
+    board = prepare_snapshot(snapshot([1, 2, None, 3]))["Hay"]
+    assert not pd.api.types.is_extension_array_dtype(board["rank"])
+    assert top_by_rank(board, 10)["steam_name"].tolist() == ["player_0", "player_1", "player_3"]
+    assert rank_range(board, 2, 3)["rank"].tolist() == [2, 3]
+
+
+def test_unknown_board_is_empty():
+    snap = prepare_snapshot(snapshot([1, 2]))
+    assert top_by_rank(snap["Maze"], 10).empty
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from utils.partition import partition_by_leaderboard
+from utils.records import EVENT_COLUMNS, SUMMARY_COLUMNS, build_record_events, record_summary
+
+
+def history(value_col="top_1_ms"):
+    times = pd.date_range("2026-01-01", periods=6, freq="D", tz="UTC")
+    df = pd.DataFrame({
+        "time": times.append(times),
+        "leaderboard_name": ["Hay"] * 6 + ["Wood"] * 6,
+        value_col: [100, 100, 90, 95, 80, 80] + [50] * 6,
+        "top_10_ms": [200] * 12,
+    })
+    return partition_by_leaderboard(df, "time")
+
+
+def test_record_events():
+    events = build_record_events(history())
+    hay = events[events["leaderboard_name"] == "Hay"]
+    assert hay["record_ms"].tolist() == [100, 90, 80]
+    assert hay["improvement_ms"].tolist()[1:] == [10, 10]
+    assert hay["stood_days"].tolist() == [2, 2, 1]
+    assert hay["current"].tolist() == [False, False, True]
+
+    summary = record_summary(events).set_index("leaderboard_name")
+    assert summary.loc["Hay", "records"] == 3
+    assert summary.loc["Wood", "records"] == 1
+    assert summary.loc["Hay", "total_improvement_pct"] == 20
+
+
+def test_top_1_column_is_found_by_its_label():
+    events = build_record_events(history("top1_ms"))
+    assert events[events["leaderboard_name"] == "Hay"]["record_ms"].tolist() == [100, 90, 80]
+
+
+def test_no_top_1_column():
+    events = build_record_events(history("duration_ms"))
+    assert list(events.columns) == EVENT_COLUMNS
+    assert events.empty
+    assert list(record_summary(events).columns) == SUMMARY_COLUMNS
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from utils.downsample import m4_buckets
+from utils.rollups import RESOLUTIONS, pick_resolution, rollup_board
+
+
+def test_buckets_keep_their_last_sample_and_time():
+    board = pd.DataFrame({
+        "time": pd.to_datetime(
+            ["2026-01-01 00:05", "2026-01-01 00:40", "2026-01-01 01:10"], utc=True
+        ),
+        "top_1_ms": [300, 200, 100],
+    })
+    hourly = rollup_board(board, RESOLUTIONS["hour"])
+    assert hourly["time"].dt.strftime("%H:%M").tolist() == ["00:40", "01:10"]
+    assert hourly["top_1_ms"].tolist() == [200, 100]
+    assert list(hourly.columns) == ["time", "top_1_ms"]
+
+
+def test_rollups_are_only_used_when_at_least_as_fine_as_the_drawn_raw_history():
+    min_buckets = m4_buckets(4000, 4)  # 250 buckets
+    windows = [1, 7, 14, 30, 90]
+    picked = [pick_resolution(w, None, min_buckets) for w in windows]
+    assert picked == ["raw", "raw", "hour", "hour", "hour"]
+    for window, resolution in zip(windows, picked):
+        if resolution != "raw":
+            assert pd.Timedelta(days=window) / RESOLUTIONS[resolution] >= min_buckets
+    assert pick_resolution(None, pd.Timedelta(days=1000), min_buckets) == "day"
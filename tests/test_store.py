@@ -0,0 +1,42 @@
+import threading
+from types import SimpleNamespace
+
+from utils.store import DataStore
+
+
+def test_derive_waits_only_for_the_same_key():
+    store = DataStore()
+    building = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        building.set()
+        release.wait(5)
+        return "slow"
+
+    thread = threading.Thread(target=store.derive, args=("slow", 1, slow))
+    thread.start()
+    building.wait(5)
+    # Another key is built while the slow one is still running
+    assert store.derive("fast", 1, lambda: "fast") == "fast"
+    release.set()
+    thread.join(5)
+    assert store.derive("slow", 1, lambda: "rebuilt") == "slow"
+
+
+def test_derive_build_may_derive_other_values():
+    store = DataStore()
+    value = store.derive("outer", 1, lambda: store.derive("inner", 1, lambda: 2) + 1)
+    assert value == 3
+
+
+def test_history_callbacks_run_once_per_version():
+    store = DataStore()
+    seen = []
+    store.on_history(lambda store, data: seen.append(data.history_version))
+
+    store._warm(SimpleNamespace(over_time=None, history_version=None))
+    store._warm(SimpleNamespace(over_time={}, history_version="v1"))
+    store._warm(SimpleNamespace(over_time={}, history_version="v1"))
+    store._warm(SimpleNamespace(over_time={}, history_version="v2"))
+    assert seen == ["v1", "v2"]
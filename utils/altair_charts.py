@@ -1,44 +1,55 @@
 """Code to help with altair charts. A lot of this was vibe coded."""
 
-import math
+import json
 
 import altair as alt
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 from datetime import datetime, timezone
 
-from .constants import get_leaderboard_color, DEFAULT_COLOR
-from .prettify import prettify_colnames
+from .cache import LRUCache
+from .constants import (
+    get_leaderboard_color,
+    DEFAULT_COLOR,
+    HISTORY_CHART_POINTS,
+    CHART_NOW_QUANTUM_S,
+    CHART_SPEC_CACHE_ENTRIES,
+    CHART_SPEC_CACHE_BYTES,
+    COMPARE_CHART_POINTS,
+)
+from .downsample import downsample, m4_buckets
+from .prettify import standardize_series_label, top_1_column
+from .profiling import section, timed
+from .rollups import pick_resolution
+from .timestamps import parse_timestamps
+from .typing import zero_padded
 
 
 def _find_time_column(df: pd.DataFrame):
     candidates = ["minute_ts", "fetched_at", "timestamp", "time", "datetime", "date"]
-    for col in candidates:
-        if col in df.columns:
-            # try to convert to datetime, return if successful
-            ser = pd.to_datetime(df[col], errors="coerce", utc=True)
-            if ser.notna().any():
-                return col
-    return None
+    present = [col for col in candidates if col in df.columns and df[col].notna().any()]
+    # Loaded frames carry parsed timestamps already; prefer those over raw columns
+    for col in present:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            return col
+    return present[0] if present else None
 
 
-def _melt_measure_columns(df: pd.DataFrame):
+def _melt_measure_columns(df: pd.DataFrame, time_col: str):
     # Prefer multiple *_ms columns if present; else fall back to a single duration_ms column
     ms_cols = [c for c in df.columns if c.endswith("_ms")]
     if len(ms_cols) > 1:
         melted = df.melt(
-            id_vars=[c for c in df.columns if c not in ms_cols],
+            id_vars=[time_col],
             value_vars=ms_cols,
             var_name="series",
             value_name="value_ms",
         )
-        # Clean series names: remove trailing _ms and prettify
-        melted["series"] = (
-            melted["series"]
-            .str.replace("_ms$", "", regex=True)
-            .map(_standardize_series_label)
-        )
+        # Clean series names: remove trailing _ms and prettify (once per column, not per row)
+        labels = {c: standardize_series_label(c[:-3]) for c in ms_cols}
+        melted["series"] = melted["series"].map(labels)
         return melted, "series", "value_ms"
     # Single metric case
     value_col = (
@@ -48,59 +59,12 @@ def _melt_measure_columns(df: pd.DataFrame):
     )
     if value_col is None:
         return None, None, None
-    out = df.copy()
-    out["series"] = _standardize_series_label("duration")
+    out = df[[time_col, value_col]].copy()
+    out["series"] = standardize_series_label("duration")
     out["value_ms"] = out[value_col]
     return out, "series", "value_ms"
 
 
-def _standardize_series_label(raw: str) -> str:
-    s = str(raw).strip().replace("-", " ").replace(".", " ")
-    s_lower = s.lower()
-
-    # Heuristics to map to Top N naming
-    def to_top(n: str) -> str:
-        return f"Top {n}"
-
-    if (
-        any(tok in s_lower for tok in ["top1", "top 1", "rank1", "rank 1", "r1", "1 "])
-        or s_lower.endswith(" 1")
-        or s_lower.endswith("1")
-    ):
-        return to_top("1")
-    if (
-        any(tok in s_lower for tok in ["top2", "top 2", "rank2", "rank 2", "r2", "2 "])
-        or s_lower.endswith(" 2")
-        or s_lower.endswith("2")
-    ):
-        return to_top("2")
-    if (
-        any(tok in s_lower for tok in ["top3", "top 3", "rank3", "rank 3", "r3", "3 "])
-        or s_lower.endswith(" 3")
-        or s_lower.endswith("3")
-    ):
-        return to_top("3")
-    if (
-        any(
-            tok in s_lower
-            for tok in ["top10", "top 10", "rank10", "rank 10", "r10", "10 "]
-        )
-        or s_lower.endswith(" 10")
-        or s_lower.endswith("10")
-    ):
-        return to_top("10")
-    if (
-        any(
-            tok in s_lower
-            for tok in ["top100", "top 100", "rank100", "rank 100", "r100", "100 "]
-        )
-        or s_lower.endswith(" 100")
-        or s_lower.endswith("100")
-    ):
-        return to_top("100")
-    return prettify_colnames(s)
-
-
 def _series_color(label: str) -> str:
     mapping = {
         "Top 1": "#FFD700",  # gold
@@ -119,72 +83,135 @@ def _series_dash(label: str):
     return [1, 0]
 
 
-def display_over_time_chart(
-    df: pd.DataFrame, leaderboard_name: str, hide_top_100: bool = True
-):
-    if "leaderboard_name" not in df.columns:
-        st.info("No leaderboard_name column found in over-time dataset.")
-        return
+def _series_hms(values: pd.Series) -> pd.Series:
+    # h:mm:ss.mmm / m:ss.mmm, negative clamped to 0, missing -> ""
+    ms = values.to_numpy(dtype="float64", na_value=np.nan)
+    valid = np.isfinite(ms)
+    total = np.where(valid, np.maximum(ms, 0), 0).astype("int64")
+    seconds, millis = np.divmod(total, 1000)
+    minutes, seconds = np.divmod(seconds, 60)
+    hours, minutes = np.divmod(minutes, 60)
+
+    tail = np.char.add(np.char.add(zero_padded(seconds, 2), "."), zero_padded(millis, 3))
+    short = np.char.add(np.char.add(minutes.astype(str), ":"), tail)
+    long = np.char.add(np.char.add(hours.astype(str), ":"), zero_padded(minutes, 2))
+    long = np.char.add(np.char.add(long, ":"), tail)
+    out = np.where(hours > 0, long, short)
+    return pd.Series(np.where(valid, out, ""), index=values.index)
+
+
+# Human-readable axis labels (ms -> h:mm:ss or m:ss)
+MS_LABEL_EXPR = (
+    "floor(datum.value/3600000) > 0 ? "
+    "floor(datum.value/3600000) + ':' + "
+    "(floor((datum.value%3600000)/60000) < 10 ? '0' : '') + floor((datum.value%3600000)/60000) + ':' + "
+    "(floor((datum.value%60000)/1000) < 10 ? '0' : '') + floor((datum.value%60000)/1000) : "
+    "floor(datum.value/60000) + ':' + (floor((datum.value%60000)/1000) < 10 ? '0' : '') + floor((datum.value%60000)/1000)"
+)
+
+# Built specs, shared by every session: (leaderboard, hide_top_100, data version, now) -> spec
+_spec_cache = LRUCache(CHART_SPEC_CACHE_ENTRIES, CHART_SPEC_CACHE_BYTES)
+
+
+class ChartDataError(Exception):
+    """Nothing to plot; the message is shown in place of the chart."""
+
 
-    # Filter to selected leaderboard
-    sdf = df[df["leaderboard_name"] == leaderboard_name].copy()
+def _plotted_columns(columns, hide_top_100=True):
+    ms_cols = [c for c in columns if c.endswith("_ms")]
+    if hide_top_100:
+        plotted = [c for c in ms_cols if standardize_series_label(c[:-3]) != "Top 100"]
+        ms_cols = plotted or ms_cols
+    return ms_cols
+
+
+def prepare_over_time_data(
+    sdf: pd.DataFrame,
+    hide_top_100: bool = True,
+    window_days: int = 14,
+    max_points: int = HISTORY_CHART_POINTS,
+):
     if sdf.empty:
-        st.info("No data available for this leaderboard.")
-        return
+        raise ChartDataError("No data available for this leaderboard.")
+    sdf = sdf.copy()
 
     # Find time column and parse
     time_col = _find_time_column(sdf)
     if not time_col:
-        st.info("No time column found to plot over time.")
-        return
-    sdf[time_col] = pd.to_datetime(sdf[time_col], errors="coerce", utc=True)
+        raise ChartDataError("No time column found to plot over time.")
+    if not pd.api.types.is_datetime64_any_dtype(sdf[time_col]):
+        sdf[time_col], _, _ = parse_timestamps(sdf[time_col], source="history chart")
     sdf = sdf.dropna(subset=[time_col])
     if sdf.empty:
-        st.info("No valid timestamps to plot.")
-        return
+        raise ChartDataError("No valid timestamps to plot.")
 
-    # Two-week window based on max timestamp in data
-    max_ts = sdf[time_col].max()
-    cutoff = max_ts - pd.Timedelta(days=14)
-    sdf = sdf[sdf[time_col] >= cutoff]
-    if sdf.empty:
-        st.info("No data in the last 14 days.")
-        return
+    # Window (two weeks by default; None for all history) based on max timestamp in data
+    if window_days is not None:
+        max_ts = sdf[time_col].max()
+        cutoff = max_ts - pd.Timedelta(days=window_days)
+        sdf = sdf[sdf[time_col] >= cutoff]
+        if sdf.empty:
+            raise ChartDataError(f"No data in the last {window_days:g} days.")
+
+    # Keep only the rows needed to draw each series at chart resolution
+    ms_cols = _plotted_columns(sdf.columns, hide_top_100)
+    step_cols = [c for c in ms_cols if standardize_series_label(c[:-3]) == "Top 1"]
+    sdf = downsample(sdf.sort_values(time_col), time_col, ms_cols, max_points, step_cols)
 
     # Prepare value columns
-    melted, series_col, value_col = _melt_measure_columns(sdf)
+    melted, series_col, value_col = _melt_measure_columns(sdf, time_col)
     if melted is None:
-        st.info("No duration columns found to plot.")
-        return
+        raise ChartDataError("No duration columns found to plot.")
 
     # Optionally hide Top 100 series
     if series_col and hide_top_100:
         melted = melted[melted[series_col] != "Top 100"]
         if melted.empty:
-            st.info("No data to plot after filtering Top 100.")
-            return
+            raise ChartDataError("No data to plot after filtering Top 100.")
 
     # Add human-readable duration for single-series tooltip convenience
-    def _format_ms(ms: float) -> str:
-        try:
-            ms = float(ms)
-        except Exception:
-            return ""
-        if not math.isfinite(ms):
-            return ""
-        if ms < 0:
-            ms = 0.0
-        total_seconds = int(ms // 1000)
-        millis = int(ms % 1000)
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        if hours > 0:
-            return f"{hours}:{minutes:02d}:{seconds:02d}.{millis:03d}"
-        return f"{minutes}:{seconds:02d}.{millis:03d}"
-
-    melted["value_hms"] = melted[value_col].apply(_format_ms)
+    melted["value_hms"] = _series_hms(melted[value_col])
+    return melted, time_col, series_col, value_col
+
 
+@timed("chart.prepare_all")
+def prepare_all_over_time_data(
+    over_time: dict, window_days: int = 14, hide_top_100: bool = True, rollups: dict = None
+):
+    """Chart-ready data for every leaderboard, computed once per data refresh.
+
+    With ``rollups`` (from utils.rollups.build_rollups), each board is drawn
+    from the coarsest resolution that is still at least as fine as the
+    downsampled raw history, so long windows cost no more than short ones.
+    Boards with nothing to plot map to the ChartDataError to show instead.
+    """
+    prepared = {}
+    for leaderboard_name, board in over_time.items():
+        if rollups and not board.empty:
+            span = board["time"].max() - board["time"].min()
+            n_series = len(_plotted_columns(board.columns, hide_top_100))
+            resolution = pick_resolution(
+                window_days, span, m4_buckets(HISTORY_CHART_POINTS, n_series)
+            )
+            if resolution != "raw":
+                board = rollups[resolution][leaderboard_name]
+        try:
+            prepared[leaderboard_name] = prepare_over_time_data(
+                board, hide_top_100, window_days
+            )
+        except ChartDataError as e:
+            prepared[leaderboard_name] = e
+    return prepared
+
+
+def build_over_time_chart(
+    melted: pd.DataFrame,
+    time_col: str,
+    series_col: str,
+    value_col: str,
+    leaderboard_name: str,
+    now_dt: datetime = None,
+):
     # Compute default y max = 3 * latest Top 1 value (fallback: 3 * min latest across series)
     y_max = None
     if series_col:
@@ -202,24 +229,16 @@ def display_over_time_chart(
         y_max = max(0.0, last_val * 3.0)
 
     # Build chart base with right edge anchored to current time
-    now_dt = datetime.now(timezone.utc)
-    base = alt.Chart(melted).encode(
+    now_dt = now_dt or datetime.now(timezone.utc)
+    # Layers carry no data of their own; the layer chart holds the one shared dataset
+    base = alt.Chart().encode(
         x=alt.X(f"{time_col}:T", title="Time", scale=alt.Scale(domainMax=now_dt))
     )
 
-    # Human-readable axis labels (ms -> h:mm:ss or m:ss)
-    ms_label_expr = (
-        "floor(datum.value/3600000) > 0 ? "
-        "floor(datum.value/3600000) + ':' + "
-        "(floor((datum.value%3600000)/60000) < 10 ? '0' : '') + floor((datum.value%3600000)/60000) + ':' + "
-        "(floor((datum.value%60000)/1000) < 10 ? '0' : '') + floor((datum.value%60000)/1000) : "
-        "floor(datum.value/60000) + ':' + (floor((datum.value%60000)/1000) < 10 ? '0' : '') + floor((datum.value%60000)/1000)"
-    )
-
     y_enc = alt.Y(
         f"{value_col}:Q",
         title="Duration",
-        axis=alt.Axis(labelExpr=ms_label_expr),
+        axis=alt.Axis(labelExpr=MS_LABEL_EXPR),
         scale=alt.Scale(domainMin=0, domainMax=y_max),
     )
 
@@ -241,7 +260,7 @@ def display_over_time_chart(
 
         # Rule + tooltip at hovered x
         rule = (
-            alt.Chart(melted)
+            alt.Chart()
             .mark_rule(color="gray")
             .encode(
                 x=alt.X(f"{time_col}:T"),
@@ -254,7 +273,7 @@ def display_over_time_chart(
             .add_selection(hover)
         )
 
-        chart = (line + rule).properties(height=300).add_selection(zoom_x)
+        chart = alt.layer(line, rule, data=melted).properties(height=300).add_selection(zoom_x)
     else:
         # Build domain/range mappings for color and dash
         domain = series_values
@@ -289,7 +308,7 @@ def display_over_time_chart(
         calc_map = {f"{sv}_hms": ms_expr(sv) for sv in domain}
 
         rule = (
-            alt.Chart(melted)
+            alt.Chart()
             .transform_pivot(series_col, value=value_col, groupby=[time_col])
             .transform_calculate(**calc_map)
             .mark_rule(color="gray")
@@ -304,6 +323,242 @@ def display_over_time_chart(
             .add_selection(hover)
         )
 
-        chart = (line + rule).properties(height=300).add_selection(zoom_x)
+        chart = alt.layer(line, rule, data=melted).properties(height=300).add_selection(zoom_x)
+
+    return chart
+
+
+def _quantized_now(quantum_s: int = CHART_NOW_QUANTUM_S) -> datetime:
+    # Round "now" up so the x-axis right edge (and the cached spec) changes once per quantum
+    now_s = datetime.now(timezone.utc).timestamp()
+    return datetime.fromtimestamp(-(-now_s // quantum_s) * quantum_s, timezone.utc)
+
 
-    st.altair_chart(chart, use_container_width=True)
+def over_time_chart_spec(
+    chart_data: dict, leaderboard_name: str, data_version, hide_top_100: bool = True
+):
+    """Serialized Vega-Lite spec for one board, memoized per data version.
+
+    Returns the ChartDataError to show instead when there is nothing to plot.
+    """
+    now_dt = _quantized_now()
+    key = (leaderboard_name, hide_top_100, data_version, now_dt)
+    spec = _spec_cache.get(key)
+    if spec is not None:
+        return spec
+
+    data = chart_data.get(
+        leaderboard_name, ChartDataError("No data available for this leaderboard.")
+    )
+    if isinstance(data, ChartDataError):
+        return data
+    with section("chart.spec") as stats:
+        chart = build_over_time_chart(*data, leaderboard_name, now_dt=now_dt)
+        # Size is already bounded by downsampling; st.altair_chart skips this check too
+        with alt.data_transformers.disable_max_rows():
+            spec = chart.to_dict()
+        stats["rows"], stats["bytes"] = len(data[0]), len(json.dumps(spec))
+    _spec_cache.put(key, spec, size=stats["bytes"])
+    return spec
+
+
+@timed("display.over_time_chart")
+def display_over_time_chart(
+    chart_data: dict, leaderboard_name: str, data_version, hide_top_100: bool = True
+):
+    # chart_data comes from prepare_all_over_time_data; the spec itself is memoized
+    spec = over_time_chart_spec(chart_data, leaderboard_name, data_version, hide_top_100)
+    if isinstance(spec, ChartDataError):
+        st.info(str(spec))
+        return
+    st.vega_lite_chart(dict(spec), use_container_width=True)
+
+
+def build_record_progression_chart(events: pd.DataFrame, leaderboard_name: str, now_dt: datetime):
+    # One point per record; the step line carries the current record on to now
+    points = pd.DataFrame({
+        "time": events["time"],
+        "record_ms": events["record_ms"].astype("int64"),
+        "record_hms": _series_hms(events["record_ms"]),
+        "improvement_hms": _series_hms(events["improvement_ms"]),
+        "improvement_pct": events["improvement_pct"].round(2),
+        "stood_days": events["stood_days"].round(1),
+    }).reset_index(drop=True)
+    line_data = pd.concat(
+        [points[["time", "record_ms"]], points[["record_ms"]].tail(1).assign(time=pd.Timestamp(now_dt))],
+        ignore_index=True,
+    )
+    color = get_leaderboard_color(leaderboard_name)
+    x = alt.X("time:T", title="Time")
+    y = alt.Y(
+        "record_ms:Q",
+        title="Top 1",
+        axis=alt.Axis(labelExpr=MS_LABEL_EXPR),
+        scale=alt.Scale(zero=False),
+    )
+    line = alt.Chart(line_data).mark_line(interpolate="step-after", color=color).encode(x=x, y=y)
+    dots = alt.Chart(points).mark_point(filled=True, color=color).encode(
+        x=x,
+        y=y,
+        tooltip=[
+            alt.Tooltip("time:T", title="Set", format="%Y-%m-%d %H:%M"),
+            alt.Tooltip("record_hms:N", title="Record"),
+            alt.Tooltip("improvement_hms:N", title="Improvement"),
+            alt.Tooltip("improvement_pct:Q", title="Improvement %"),
+            alt.Tooltip("stood_days:Q", title="Stood (days)"),
+        ],
+    )
+    zoom_x = alt.selection_interval(bind="scales", encodings=["x"])
+    return alt.layer(line, dots).properties(height=250).add_selection(zoom_x)
+
+
+def record_progression_chart_spec(events: pd.DataFrame, leaderboard_name: str, data_version):
+    """Serialized step chart of one board's records, memoized per data version.
+
+    ``events`` is the table from ``utils.records.build_record_events``: one row
+    per record, so the payload stays small even over the full history.
+    """
+    now_dt = _quantized_now()
+    key = ("records", leaderboard_name, data_version, now_dt)
+    spec = _spec_cache.get(key)
+    if spec is not None:
+        return spec
+
+    board = events[events["leaderboard_name"] == leaderboard_name]
+    if board.empty:
+        return ChartDataError("No records yet for this leaderboard.")
+    with section("chart.spec") as stats:
+        # Boards that improve on every scrape get the same M4 cap as the history chart
+        board = downsample(board, "time", ["record_ms"], HISTORY_CHART_POINTS // 2)
+        chart = build_record_progression_chart(board, leaderboard_name, now_dt)
+        with alt.data_transformers.disable_max_rows():
+            spec = chart.to_dict()
+        stats["rows"], stats["bytes"] = len(board), len(json.dumps(spec))
+    _spec_cache.put(key, spec, size=stats["bytes"])
+    return spec
+
+
+@timed("display.record_progression")
+def display_record_progression(events: pd.DataFrame, leaderboard_name: str, data_version):
+    spec = record_progression_chart_spec(events, leaderboard_name, data_version)
+    if isinstance(spec, ChartDataError):
+        st.info(str(spec))
+        return
+    st.vega_lite_chart(dict(spec), use_container_width=True)
+
+
+@timed("chart.prepare_comparison")
+def prepare_comparison_data(over_time: dict, window_days: int = 14, rollups: dict = None):
+    """Top 1 of every board over the window, normalized to its current record.
+
+    Done once per data refresh; ``comparison_chart_spec`` only downsamples and
+    stacks the selected boards. ``ratio`` is 1 at the current record.
+    """
+    prepared = {}
+    for leaderboard_name, board in over_time.items():
+        value_col = top_1_column(board.columns)
+        if board.empty or value_col is None:
+            continue
+        if rollups:
+            span = board["time"].max() - board["time"].min()
+            # As fine as one board drawn alone (the most a selection gives a board)
+            resolution = pick_resolution(window_days, span, m4_buckets(COMPARE_CHART_POINTS, 1))
+            if resolution != "raw":
+                board = rollups[resolution][leaderboard_name]
+        board = board[["time", value_col]].dropna()
+        if window_days is not None and not board.empty:
+            board = board[board["time"] >= board["time"].max() - pd.Timedelta(days=window_days)]
+        if board.empty:
+            continue
+        top_1 = board[value_col].to_numpy(dtype="float64")
+        prepared[leaderboard_name] = pd.DataFrame({
+            "time": board["time"].reset_index(drop=True),
+            "top_1_ms": top_1,
+            "ratio": top_1 / top_1[-1],
+        })
+    return prepared
+
+
+def build_comparison_chart(long: pd.DataFrame, names: list, now_dt: datetime):
+    # Colors come from COLORS, so a board and its Single variant share one: dash the Single one
+    color = alt.Color(
+        "leaderboard_name:N",
+        title="Leaderboard",
+        scale=alt.Scale(domain=names, range=[get_leaderboard_color(n) for n in names]),
+    )
+    dash = alt.StrokeDash(
+        "leaderboard_name:N",
+        legend=None,
+        scale=alt.Scale(
+            domain=names, range=[[4, 2] if n.endswith("Single") else [1, 0] for n in names]
+        ),
+    )
+    zoom_x = alt.selection_interval(bind="scales", encodings=["x"])
+    return (
+        alt.Chart(long)
+        .mark_line(interpolate="step-after")
+        .encode(
+            x=alt.X("time:T", title="Time", scale=alt.Scale(domainMax=now_dt)),
+            y=alt.Y(
+                "ratio:Q",
+                title="Top 1 / current record",
+                axis=alt.Axis(format=".0%"),
+                scale=alt.Scale(zero=False),
+            ),
+            color=color,
+            strokeDash=dash,
+            tooltip=[
+                alt.Tooltip("leaderboard_name:N", title="Leaderboard"),
+                alt.Tooltip("time:T", title="Time", format="%Y-%m-%d %H:%M"),
+                alt.Tooltip("value_hms:N", title="Top 1"),
+                alt.Tooltip("ratio:Q", title="Of current record", format=".1%"),
+            ],
+        )
+        .properties(height=400)
+        .add_selection(zoom_x)
+    )
+
+
+def comparison_chart_spec(
+    prepared: dict, names: list, data_version, max_points: int = COMPARE_CHART_POINTS
+):
+    """Serialized overlay of the ``names`` boards from ``prepare_comparison_data``.
+
+    All boards share one long-format dataset of at most about ``max_points``
+    rows: each gets an equal share of the budget. Memoized per selection and
+    data version.
+    """
+    names = [n for n in names if n in prepared]
+    if not names:
+        return ChartDataError("No data available for the selected leaderboards.")
+    now_dt = _quantized_now()
+    key = ("compare", tuple(names), data_version, now_dt)
+    spec = _spec_cache.get(key)
+    if spec is not None:
+        return spec
+
+    with section("chart.spec") as stats:
+        per_board = max(max_points // len(names), 4)
+        long = pd.concat(
+            [
+                downsample(prepared[n], "time", ["ratio"], per_board).assign(leaderboard_name=n)
+                for n in names
+            ],
+            ignore_index=True,
+        )
+        long["value_hms"] = _series_hms(long["top_1_ms"])
+        chart = build_comparison_chart(long.drop(columns="top_1_ms"), names, now_dt)
+        with alt.data_transformers.disable_max_rows():
+            spec = chart.to_dict()
+        stats["rows"], stats["bytes"] = len(long), len(json.dumps(spec))
+    _spec_cache.put(key, spec, size=stats["bytes"])
+    return spec
+
+
+@timed("display.comparison_chart")
+def display_comparison_chart(prepared: dict, names: list, data_version):
+    spec = comparison_chart_spec(prepared, names, data_version)
+    if isinstance(spec, ChartDataError):
+        st.info(str(spec))
+        return
+    st.vega_lite_chart(dict(spec), use_container_width=True)
@@ -1,7 +1,30 @@
+import os
+from pathlib import Path
+
 OVER_TIME_S3 = "s3://tfwr-data/leaderboard/over_time_ms.csv"
 GAPS_LATEST_S3 = "s3://tfwr-data/leaderboard/gaps_latest_ms.csv"
 PERCENTILES_S3 = "s3://tfwr-data/leaderboard/percentiles.csv"
 
+# Optional columnar copies of the CSVs above; loaders fall back to the CSV when missing
+OVER_TIME_PARQUET_S3 = "s3://tfwr-data/leaderboard/over_time_ms.parquet"
+GAPS_LATEST_PARQUET_S3 = "s3://tfwr-data/leaderboard/gaps_latest_ms.parquet"
+PERCENTILES_PARQUET_S3 = "s3://tfwr-data/leaderboard/percentiles.parquet"
+
+# Local copies of downloaded objects, so restarts do not re-download unchanged data
+CACHE_DIR = os.environ.get(
+    "TFWR_CACHE_DIR", str(Path.home() / ".cache" / "tfwr-leaderboard")
+)
+
+SNAPSHOT_COLUMNS = [
+    "leaderboard_name",
+    "rank",
+    "steam_name",
+    "duration_ms",
+    "gap_prev_ms",
+    "gap_leader_ms",
+    "achieved_at",
+]
+
 
 TABS = [
     "Overview",
@@ -45,10 +68,42 @@ EMOJIS = {
     "Sunflowers": ":sunflower:",
     "Dinosaur": ":bone:",
     "Fastest": ":fast_forward:",
+    "Compare": ":bar_chart:",
 }
 
 DEFAULT_COLOR = "#1f77b4"
 
+# Max rows per history chart, after downsampling (~ a few points per pixel of width)
+HISTORY_CHART_POINTS = 4000
+# Max rows of the comparison chart in total, however many boards are overlaid
+COMPARE_CHART_POINTS = 4000
+# How often the background refresher reloads the published data
+REFRESH_INTERVAL_S = 300
+# Data derived from a store version (rollups, chart-ready history, ...); oldest evicted
+DERIVED_CACHE_ENTRIES = 32
+# Label -> days of history shown (None: all of it)
+HISTORY_WINDOWS = {"24h": 1, "7d": 7, "14d": 14, "30d": 30, "90d": 90, "All": None}
+HISTORY_DEFAULT_WINDOW = "14d"
+# Ranks per page of a full leaderboard
+LEADERBOARD_PAGE_SIZE = 100
+# Recent snapshot changes kept for the movers feed, and how deep rank-up moves are reported
+MOVERS_MAX_EVENTS = 500
+MOVERS_RANK_LIMIT = 100
+
+# Share of runs whose sections are timed, logged and counted (see utils.profiling);
+# ?profile=1 always profiles that run and shows the debug panel
+PROFILE_SAMPLE_RATE = float(os.environ.get("TFWR_PROFILE_SAMPLE_RATE", "0"))
+
+# JSON API (api.py): largest top?n=, and serialized responses kept per data version
+API_MAX_TOP_N = 1000
+API_CACHE_ENTRIES = 1024
+API_CACHE_BYTES = 128 * 2**20
+
+# Built history chart specs kept in memory, and how often their "now" edge moves
+CHART_SPEC_CACHE_ENTRIES = 64
+CHART_SPEC_CACHE_BYTES = 64 * 2**20
+CHART_NOW_QUANTUM_S = 300
+
 
 def get_leaderboard_color(leaderboard_name):
     return COLORS.get(leaderboard_name.split()[0], DEFAULT_COLOR)
@@ -0,0 +1,158 @@
+"""Derive the published tables from one raw snapshot of ranked entries.
+
+``gaps_latest_ms.csv``, ``percentiles.csv`` and the rows appended to
+``over_time_ms.csv`` are all functions of the same entries. Building them here,
+in one pass over the entries sorted by board and time, keeps the three
+consistent with each other. Everything is computed with grouped NumPy
+operations on the sorted arrays, so it scales to millions of entries.
+
+    python -m utils.derive <entries_csv_url> <output_dir_url> [time]
+
+The input needs ``leaderboard_name``, ``steam_name``, ``duration_ms`` and
+``achieved_at``. The output directory receives ``gaps_latest_ms.csv`` and
+``percentiles.csv``, and one row per board is appended to ``over_time_ms.csv``
+(created with a header if missing). Appended rows follow the existing header's
+column order; a file with other columns is an error.
+"""
+
+import io
+import sys
+
+import numpy as np
+import pandas as pd
+from fsspec.core import url_to_fs
+
+from .constants import SNAPSHOT_COLUMNS
+from .timestamps import parse_timestamps
+
+PERCENTILES = [1, 10, 25, 50]
+HISTORY_RANKS = [1, 2, 3, 10, 100]
+
+
+def _sort_entries(entries):
+    # By board, then fastest time, then whoever got there first
+    board = entries["leaderboard_name"].astype("category")
+    order = np.lexsort((
+        entries["achieved_at"].to_numpy(dtype="int64", na_value=np.iinfo("int64").max),
+        entries["duration_ms"].to_numpy(dtype="int64"),
+        board.cat.codes.to_numpy(),
+    ))
+    return entries.iloc[order].reset_index(drop=True)
+
+
+def _group_starts(names):
+    """Start of every run of equal values in ``names``, plus the end."""
+    values = names.to_numpy()
+    if not len(values):
+        return np.array([0])
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    return np.r_[starts, len(values)]
+
+
+def derive_snapshot(entries):
+    """``gaps_latest_ms``: entries ranked per board with previous-rank and leader gaps.
+
+    Ranks are distinct like Steam's: equal times are ordered by who set them first.
+    """
+    df = _sort_entries(entries.dropna(subset=["leaderboard_name", "duration_ms"]))
+    bounds = _group_starts(df["leaderboard_name"])
+    sizes = np.diff(bounds)
+    group_start = np.repeat(bounds[:-1], sizes)
+    position = np.arange(len(df)) - group_start
+
+    duration = df["duration_ms"].to_numpy(dtype="int64")
+    df["rank"] = position + 1
+
+    gap_prev = np.r_[0, np.diff(duration)].astype("float64")
+    gap_prev[position == 0] = np.nan
+    df["gap_prev_ms"] = gap_prev
+    df["gap_leader_ms"] = duration - duration[group_start]
+    return df[SNAPSHOT_COLUMNS]
+
+
+def _nth_per_board(snapshot, positions):
+    """duration_ms at each 0-based ``positions[i]`` of every board (NaN past the end)."""
+    bounds = _group_starts(snapshot["leaderboard_name"])
+    starts, sizes = bounds[:-1], np.diff(bounds)
+    duration = snapshot["duration_ms"].to_numpy(dtype="float64")
+    out = np.full((len(starts), len(positions)), np.nan)
+    for i, pos in enumerate(positions):
+        pos = np.asarray(pos) if np.ndim(pos) else np.full(len(starts), pos)
+        valid = pos < sizes
+        out[valid, i] = duration[starts[valid] + pos[valid]]
+    names = snapshot["leaderboard_name"].to_numpy()[starts]
+    return names, sizes, out
+
+
+def derive_percentiles(snapshot, percentiles=PERCENTILES):
+    """``percentiles``: the time needed for the top p% of each board, and its entry count."""
+    bounds = _group_starts(snapshot["leaderboard_name"])
+    sizes = np.diff(bounds)
+    # Same definition as utils.ranks.DurationIndex.percentile
+    positions = [np.clip(np.ceil(p / 100 * sizes).astype("int64") - 1, 0, None) for p in percentiles]
+    names, sizes, values = _nth_per_board(snapshot, positions)
+    df = pd.DataFrame(values, columns=[f"p{p}_ms" for p in percentiles]).astype("Int64")
+    df.insert(0, "leaderboard_name", names)
+    df["entry_count"] = sizes
+    return df
+
+
+def derive_history_row(snapshot, time):
+    """``over_time_ms`` rows for ``time``: Top 1/2/3/10/100 times of each board."""
+    names, _, values = _nth_per_board(snapshot, [n - 1 for n in HISTORY_RANKS])
+    df = pd.DataFrame(values, columns=[f"top_{n}_ms" for n in HISTORY_RANKS]).astype("Int64")
+    df.insert(0, "leaderboard_name", names)
+    time = pd.Timestamp(time)
+    # Naive times (e.g. from the CLI) are taken as UTC, like every other row of the file
+    time = time.tz_localize("UTC") if time.tzinfo is None else time.tz_convert("UTC")
+    df.insert(0, "time", time)
+    return df
+
+
+def derive_all(entries, time=None):
+    """{"gaps_latest": ..., "percentiles": ..., "over_time_row": ...} from one snapshot."""
+    time = time if time is not None else pd.Timestamp.now(tz="UTC")
+    snapshot = derive_snapshot(entries)
+    return {
+        "gaps_latest": snapshot,
+        "percentiles": derive_percentiles(snapshot),
+        "over_time_row": derive_history_row(snapshot, time),
+    }
+
+
+def build(entries_url, output_url, time=None):
+    fs, path = url_to_fs(entries_url)
+    entries = pd.read_csv(io.BytesIO(fs.cat_file(path)))
+    entries["achieved_at"], _, _ = parse_timestamps(entries["achieved_at"], source=entries_url)
+    tables = derive_all(entries, time)
+
+    fs, out = url_to_fs(output_url)
+    fs.makedirs(out, exist_ok=True)
+    history = f"{out}/over_time_ms.csv"
+    previous = fs.cat_file(history) if fs.exists(history) else b""
+    rows = tables["over_time_row"]
+    if previous:
+        # New rows must line up with the published header, which readers keep parsing with.
+        # Checked before anything is written, so a mismatch publishes nothing
+        header = previous[:previous.find(b"\n")].decode().strip().split(",")
+        if set(header) != set(rows.columns):
+            raise ValueError(
+                f"{history} has columns {header}, derived rows have {list(rows.columns)}"
+            )
+        rows = rows[header]
+        if not previous.endswith(b"\n"):
+            previous += b"\n"
+
+    fs.pipe_file(f"{out}/gaps_latest_ms.csv", tables["gaps_latest"].to_csv(index=False).encode())
+    fs.pipe_file(f"{out}/percentiles.csv", tables["percentiles"].to_csv(index=False).encode())
+    # Only ever appended to, so the incremental history reader fetches just the new rows.
+    # Object stores cannot append in place: the object is rewritten with the new rows at the end
+    fs.pipe_file(history, previous + rows.to_csv(index=False, header=not previous).encode())
+    return tables
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        sys.exit(__doc__)
+    tables = build(sys.argv[1], sys.argv[2], *sys.argv[3:])
+    print({name: len(df) for name, df in tables.items()})
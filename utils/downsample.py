@@ -0,0 +1,58 @@
+"""Downsampling of time series before they are shipped to Vega.
+
+Uses min/max-per-bucket (M4): the time range is cut into equal-width buckets
+and, for every measure column, the first, last, minimum and maximum row of
+each bucket is kept. At one bucket per couple of pixels this draws the same
+line as the raw data. Columns that move in steps (Top 1 records) can also
+keep every change point exactly.
+"""
+
+import numpy as np
+
+
+def m4_indices(times, values, n_buckets):
+    """Positions to keep from ``values`` (sorted by ``times``), at most 4 per bucket."""
+    span = max(int(times[-1] - times[0]), 1)
+    bucket = ((times - times[0]) / span * n_buckets).astype("int64")
+    bucket = np.minimum(bucket, n_buckets - 1)
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bucket)] - 1
+    # Within-bucket order by value; buckets are contiguous so `starts` lines up
+    nan = np.isnan(values)
+    by_min = np.lexsort((np.where(nan, np.inf, values), bucket))
+    by_max = np.lexsort((np.where(nan, np.inf, -values), bucket))
+    return np.unique(np.concatenate([starts, ends, by_min[starts], by_max[starts]]))
+
+
+def change_indices(values):
+    """Positions on both sides of every change in ``values``."""
+    changed = np.flatnonzero(values[1:] != values[:-1])
+    return np.concatenate([changed, changed + 1])
+
+
+def m4_buckets(max_points, n_cols):
+    """Buckets ``downsample`` cuts the time range into for ``n_cols`` measure columns."""
+    return max(max_points // (4 * n_cols), 1)
+
+
+def downsample(df, time_col, value_cols, max_points, step_cols=()):
+    """About ``max_points`` rows of ``df`` (sorted by ``time_col``) that still draw
+    every one of ``value_cols`` faithfully.
+
+    Every change in ``step_cols`` is kept on top of that, so each step (e.g.
+    each Top 1 record) survives even when several land in one bucket.
+    """
+    if len(df) <= max_points or not value_cols:
+        return df
+    times = df[time_col].astype("int64").to_numpy()
+    n_buckets = m4_buckets(max_points, len(value_cols))
+    keep = [
+        m4_indices(times, df[col].to_numpy(dtype="float64", na_value=np.nan), n_buckets)
+        for col in value_cols
+    ]
+    keep += [
+        change_indices(df[col].to_numpy(dtype="float64", na_value=np.nan))
+        for col in step_cols
+    ]
+    return df.iloc[np.unique(np.concatenate(keep))]
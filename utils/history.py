@@ -0,0 +1,235 @@
+"""Incremental refresh of the append-only over-time history.
+
+``over_time_ms.csv`` only ever grows by a few rows per scrape, so instead of
+downloading and parsing the whole object on every refresh we remember how many
+bytes have been parsed and fetch just the new tail with a ranged read. The
+bytes right before that offset are re-read alongside the tail; if they no
+longer match, the object was rewritten rather than appended to and we fall
+back to a full reload.
+
+The parsed prefix is mirrored to the local object cache, so after a restart
+only the rows appended since are downloaded. The scraper appends whole lines,
+so only complete lines are consumed; a row still being written is picked up
+on the next refresh.
+
+Pages that only need each board's latest timestamp use ``LatestTimestamps``,
+which reads just the end of the same CSV.
+"""
+
+import io
+import threading
+
+import pandas as pd
+
+from .constants import TABS
+from .fetch import object_cache, object_version
+from .partition import LeaderboardPartitions, partition_by_leaderboard
+from .profiling import section
+from .schema import compact_frame
+from .timestamps import parse_timestamps
+from .storage import read_parquet_source
+
+
+class IncrementalHistory:
+    def __init__(
+        self, csv_url, parquet_url=None, time_col="time", overlap=256, cache=object_cache
+    ):
+        self.url = csv_url
+        self.parquet_url = parquet_url
+        self.time_col = time_col
+        self.overlap = overlap
+        self.cache = cache
+
+        self.partitions = None
+        self.last_updated = {}
+        self.columns = None
+        self.offset = 0  # bytes of the CSV parsed so far
+        self.tail = b""  # the `overlap` bytes before `offset`
+        self.version = None
+        self.time_format = None  # detected from the first rows parsed, then reused
+        # (version, partitions, last_updated) as of the last refresh, swapped as one
+        self.current = (None, None, {})
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Bring the history up to date: "unchanged", "appended" or "reloaded"."""
+        with self._lock:
+            _, _, info = self.cache.head(self.url)
+            size, version = info["size"], object_version(info)
+
+            if self.partitions is None:
+                status = "appended" if self._cold_start(size) else "reloaded"
+            elif version == self.version:
+                self.cache.count("hits")
+                return "unchanged"
+            elif size >= self.offset and self._read_tail(size):
+                status = "appended"
+            else:
+                self._reload_csv()
+                status = "reloaded"
+            self.version = version
+            self.current = (version, self.partitions, self.last_updated)
+            return status
+
+    def _cold_start(self, size):
+        # Resume from the local copy or the Parquet copy when either is a prefix of the CSV
+        local = self.cache.read_local(self.url)
+        if local:
+            end = local.rfind(b"\n") + 1
+            try:
+                df = self._parse(local[:end], header=True)
+            except (KeyError, ValueError):
+                # Not a CSV prefix after all (e.g. a damaged copy): use the other sources
+                self.time_format = None
+            else:
+                if self._resume(df, end, local[max(0, end - self.overlap):end], size):
+                    return True
+        if self.parquet_url:
+            df, source = read_parquet_source(self.parquet_url)
+            if source is not None and self._resume(compact_frame(df), *source, size):
+                return True
+        self._reload_csv()
+        return False
+
+    def _resume(self, df, offset, tail, size):
+        if offset > size:
+            return False
+        self.offset, self.tail = offset, tail
+        self.columns = list(df.columns)
+        self._set(partition_by_leaderboard(df, self.time_col))
+        return self._read_tail(size)
+
+    def _reload_csv(self):
+        data = self.cache.cat(self.url)
+        self.time_format = None  # a rewritten file may use another format
+        end = data.rfind(b"\n") + 1
+        df = self._parse(data[:end], header=True)
+        self.columns = list(df.columns)
+        self.offset = end
+        self.tail = data[max(0, end - self.overlap):end]
+        self._set(partition_by_leaderboard(df, self.time_col))
+        self.cache.write_local(self.url, str(end), data[:end])
+
+    def _read_tail(self, size):
+        start = self.offset - len(self.tail)
+        data = self.cache.cat(self.url, start=start, end=size)
+        if not data.startswith(self.tail):
+            return False
+        new = data[len(self.tail):]
+        end = new.rfind(b"\n") + 1
+        if end:
+            self._merge(self._parse(new[:end], header=False))
+            # Only extend a local copy that holds exactly the bytes parsed so far; after
+            # resuming from the Parquet copy there is none, and it stays that way
+            mirrored = self.cache.local_size(self.url) == self.offset
+            self.offset += end
+            self.tail = (self.tail + new[:end])[-self.overlap:]
+            if mirrored:
+                self.cache.write_local(self.url, str(self.offset), new[:end], append=True)
+        return True
+
+    def _parse(self, data, header):
+        with section("parse.csv") as stats:
+            if header:
+                df = pd.read_csv(io.BytesIO(data))
+            else:
+                df = pd.read_csv(io.BytesIO(data), header=None, names=self.columns)
+            stats["rows"], stats["bytes"] = len(df), len(data)
+        with section("parse.datetime") as stats:
+            df[self.time_col], self.time_format, _ = parse_timestamps(
+                df[self.time_col], self.time_format, source=self.url
+            )
+            stats["rows"] = len(df)
+        return compact_frame(df)
+
+    def _merge(self, new):
+        # Copy-on-write: readers holding the previous partitions never see a half merge
+        partitions = dict(self.partitions)
+        for name, rows in new.groupby("leaderboard_name", sort=False, observed=True):
+            previous = self.partitions[name]
+            board = pd.concat([previous, rows], ignore_index=True)
+            if not board.dtypes.equals(previous.dtypes):
+                # e.g. a value that no longer fits int32, or a new category
+                board = compact_frame(board)
+            if not board[self.time_col].is_monotonic_increasing:
+                board = board.sort_values(self.time_col, kind="stable", ignore_index=True)
+            partitions[name] = board
+
+        last_updated = dict(self.last_updated)
+        for name, ts in new.groupby("leaderboard_name", observed=True)[self.time_col].max().items():
+            prev = last_updated.get(name)
+            if prev is None or pd.isna(prev) or ts > prev:
+                last_updated[name] = ts
+
+        self.partitions = LeaderboardPartitions(partitions, self.partitions.empty)
+        self.last_updated = last_updated
+
+    def _set(self, partitions):
+        self.partitions = partitions
+        self.last_updated = {
+            name: board[self.time_col].max() for name, board in partitions.items()
+        }
+
+
+class LatestTimestamps:
+    """Latest history timestamp per board, read from the end of the CSV only.
+
+    Every scrape appends a row per board, so the last few KiB normally name
+    every board; the window doubles until they all show up or the whole file
+    has been read.
+    """
+
+    def __init__(
+        self, csv_url, time_col="time", tail_bytes=64 * 1024, boards=TABS[1:], cache=object_cache
+    ):
+        self.url = csv_url
+        self.time_col = time_col
+        self.tail_bytes = tail_bytes
+        self.boards = set(boards)
+        self.cache = cache
+        self.columns = None
+        self.time_format = None
+        self.version = None
+        self.last_updated = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """The current {board: latest timestamp}, the same dict while the CSV is unchanged."""
+        with self._lock:
+            _, _, info = self.cache.head(self.url)
+            size, version = info["size"], object_version(info)
+            if version == self.version:
+                self.cache.count("hits")
+                return self.last_updated
+
+            tail_bytes = self.tail_bytes
+            while True:
+                start = max(size - tail_bytes, 0)
+                data = self.cache.cat(self.url, start=start, end=size)
+                last_updated = self._parse(data, from_start=start == 0)
+                if start == 0 or self.boards <= last_updated.keys():
+                    break
+                tail_bytes *= 2
+            self.version = version
+            self.last_updated = last_updated
+            return last_updated
+
+    def _parse(self, data, from_start):
+        if from_start:
+            lines = data
+        else:
+            if self.columns is None:
+                header = self.cache.cat(self.url, start=0, end=4096)
+                self.columns = header[:header.find(b"\n")].decode().strip().split(",")
+            lines = data[data.find(b"\n") + 1:]  # drop the partial first line
+        lines = lines[:lines.rfind(b"\n") + 1]  # and a row still being written
+        df = pd.read_csv(
+            io.BytesIO(lines),
+            header=0 if from_start else None,
+            names=None if from_start else self.columns,
+            usecols=["leaderboard_name", self.time_col],
+        )
+        times, self.time_format, _ = parse_timestamps(
+            df[self.time_col], self.time_format, source=self.url
+        )
+        return times.groupby(df["leaderboard_name"]).max().dropna().to_dict()
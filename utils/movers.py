@@ -0,0 +1,104 @@
+"""Changes between two leaderboard snapshots.
+
+Each refresh compares the new snapshot with the previous one, board by board,
+keyed on the player name, with one merge per board. New entries, improved
+times, new records and rank climbs become events; the most recent ones are kept
+in a fixed-size ring buffer.
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .constants import MOVERS_MAX_EVENTS, MOVERS_RANK_LIMIT
+
+EVENT_COLUMNS = [
+    "detected_at",
+    "leaderboard_name",
+    "steam_name",
+    "event",
+    "rank",
+    "prev_rank",
+    "duration_ms",
+    "prev_duration_ms",
+]
+_KEY_COLUMNS = ["steam_name", "rank", "duration_ms"]
+
+
+def _entries(board):
+    # Names are unique per board in practice; if not, keep the best (first) row
+    entries = board[_KEY_COLUMNS].dropna(subset=["steam_name"])
+    entries = entries.astype({"steam_name": str})
+    return entries.drop_duplicates("steam_name")
+
+
+def diff_board(prev, curr, rank_limit=MOVERS_RANK_LIMIT):
+    """Events for one board going from ``prev`` to ``curr`` (both rank-sorted)."""
+    merged = _entries(curr).merge(
+        _entries(prev), on="steam_name", how="left", suffixes=("", "_prev")
+    )
+    rank = merged["rank"].to_numpy(dtype="float64", na_value=np.nan)
+    prev_rank = merged["rank_prev"].to_numpy(dtype="float64", na_value=np.nan)
+    duration = merged["duration_ms"].to_numpy(dtype="float64", na_value=np.nan)
+    prev_duration = merged["duration_ms_prev"].to_numpy(dtype="float64", na_value=np.nan)
+
+    new = np.isnan(prev_rank)
+    improved = duration < prev_duration
+    # Climbing because someone else dropped out; being pushed down is not news
+    climbed = ~new & ~improved & (rank < prev_rank) & (rank <= rank_limit)
+    record = (rank == 1) & (new | improved)
+    event = np.select(
+        [record, new, improved, climbed], ["record", "new", "improved", "rank_up"], ""
+    )
+    keep = event != ""
+    return pd.DataFrame(
+        {
+            "steam_name": merged["steam_name"].to_numpy()[keep],
+            "event": event[keep],
+            "rank": rank[keep],
+            "prev_rank": prev_rank[keep],
+            "duration_ms": duration[keep],
+            "prev_duration_ms": prev_duration[keep],
+        }
+    )
+
+
+def diff_snapshots(prev, curr, detected_at=None, rank_limit=MOVERS_RANK_LIMIT):
+    """Events for every board of ``curr`` (snapshot partitions)."""
+    detected_at = detected_at if detected_at is not None else pd.Timestamp.now(tz="UTC")
+    events = []
+    for name, board in curr.items():
+        previous = prev[name]
+        if board is previous:
+            continue
+        board_events = diff_board(previous, board, rank_limit)
+        if len(board_events):
+            board_events.insert(0, "leaderboard_name", name)
+            events.append(board_events)
+    if not events:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    events = pd.concat(events, ignore_index=True)
+    events.insert(0, "detected_at", detected_at)
+    return events.sort_values("rank", kind="stable", ignore_index=True)[EVENT_COLUMNS]
+
+
+class MoversFeed:
+    """The last ``max_events`` snapshot events, newest first."""
+
+    def __init__(self, max_events=MOVERS_MAX_EVENTS):
+        self._events = deque(maxlen=max_events)
+
+    def update(self, prev, curr, detected_at=None):
+        """Record the changes from ``prev`` to ``curr``; returns the events added."""
+        events = diff_snapshots(prev, curr, detected_at)
+        # Best ranks last, so they end up first in `recent`
+        self._events.extend(events.iloc[::-1].to_dict(orient="records"))
+        return events
+
+    def recent(self):
+        """The buffered events as a new frame; later updates do not change it."""
+        return pd.DataFrame(list(reversed(self._events)), columns=EVENT_COLUMNS)
+
+    def __len__(self):
+        return len(self._events)
@@ -0,0 +1,51 @@
+"""The Overview page as one render-ready payload.
+
+Every board's top rows are cut from the rank-sorted partitions and turned
+into HTML once per snapshot version. A rerun then only joins the cached
+pieces with the last-updated lines and emits a single markdown element,
+instead of slicing, renaming and marshalling a table per board.
+
+Only the "(... ago)" part of each Date cell is filled in per rerun, since it
+would go stale in the cached HTML.
+"""
+
+import html
+
+from .partition import top_by_rank
+from .prettify import series_time_ago
+
+OVERVIEW_COLUMNS = {
+    "rank": "Rank",
+    "steam_name": "Player",
+    "Time": "Time",
+    "Gap": "Gap",
+    "Gap To Leader": "Gap To Leader",
+    "Date": "Date",
+}
+
+
+# Cannot appear in the escaped cell text, so it only marks where Date cells end
+_AGO = "<!--ago-->"
+
+
+class OverviewTable:
+    """One board's cached table HTML, split where each Date cell ends."""
+
+    def __init__(self, top):
+        cells = top[list(OVERVIEW_COLUMNS)].astype(str).map(html.escape)
+        cells["Date"] += _AGO
+        table = cells.rename(columns=OVERVIEW_COLUMNS).to_html(index=False, border=0, escape=False)
+        self.pieces = table.split(_AGO)
+        self.achieved_at = top["achieved_at"]
+
+    def html(self):
+        agos = series_time_ago(self.achieved_at).tolist()
+        out = [self.pieces[0]]
+        for ago, piece in zip(agos, self.pieces[1:]):
+            out += [ago, piece]
+        return "".join(out)
+
+
+def build_overview(snapshot, leaderboards, top_n=10):
+    """[(leaderboard, OverviewTable)] for the top ``top_n`` of every board."""
+    return [(name, OverviewTable(top_by_rank(snapshot[name], top_n))) for name in leaderboards]
@@ -0,0 +1,37 @@
+class LeaderboardPartitions(dict):
+    """Leaderboard name -> that board's rows, each pre-sorted once at load time.
+
+    Looking up a board is a dict hit instead of a full scan with
+    ``df["leaderboard_name"] == name``; unknown boards give an empty frame with
+    the same columns so callers do not need to special-case them.
+    """
+
+    def __init__(self, partitions, empty):
+        super().__init__(partitions)
+        self.empty = empty
+
+    def __missing__(self, leaderboard_name):
+        return self.empty
+
+
+def partition_by_leaderboard(df, sort_by):
+    df = df.sort_values(["leaderboard_name", sort_by], kind="stable")
+    partitions = {
+        name: board.reset_index(drop=True)
+        for name, board in df.groupby("leaderboard_name", sort=False, observed=True)
+    }
+    return LeaderboardPartitions(partitions, df.iloc[:0].reset_index(drop=True))
+
+
+def top_by_rank(board, top_n):
+    # board is rank-sorted, so rank <= top_n is a prefix found by binary search
+    end = board["rank"].searchsorted(top_n, side="right")
+    return board.iloc[:end]
+
+
+def rank_range(board, first, last):
+    """Rows of a rank-sorted board with ``first <= rank <= last``."""
+    ranks = board["rank"]
+    start = ranks.searchsorted(first, side="left")
+    end = ranks.searchsorted(last, side="right")
+    return board.iloc[start:end]
@@ -0,0 +1,86 @@
+"""Player name index over the leaderboard snapshot.
+
+Built once per snapshot version: every player name maps to the boards and row
+positions of their entries, so a profile is a handful of ``iloc`` lookups
+rather than a scan of every board. Names are also kept sorted case-folded, so
+prefix search is a binary search.
+"""
+
+import bisect
+
+import numpy as np
+import pandas as pd
+
+
+class PlayerIndex:
+    def __init__(self, snapshot, name_col="steam_name"):
+        self.snapshot = snapshot
+        boards, names, positions = [], [], []
+        for board_name, board in snapshot.items():
+            valid = board[name_col].notna().to_numpy()
+            names.append(board[name_col].astype(str).to_numpy()[valid])
+            positions.append(np.flatnonzero(valid))
+            boards.append(np.full(valid.sum(), board_name, dtype=object))
+        names = np.concatenate(names) if names else np.array([], dtype=object)
+
+        order = np.argsort(names, kind="stable")
+        names = names[order]
+        self._boards = np.concatenate(boards)[order] if boards else names
+        self._positions = np.concatenate(positions)[order] if positions else names
+        # Entries of names[i] are [starts[i], starts[i + 1])
+        self.names, starts = np.unique(names, return_index=True)
+        self._starts = np.r_[starts, len(names)]
+        self._ids = {name: i for i, name in enumerate(self.names)}
+
+        folded = [name.casefold() for name in self.names]
+        self._fold_order = np.argsort(folded, kind="stable")
+        self._folded = [folded[i] for i in self._fold_order]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def search(self, prefix, limit=10):
+        """Up to ``limit`` player names starting with ``prefix``, ignoring case."""
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self._folded, prefix)
+        hi = bisect.bisect_left(self._folded, prefix + "\U0010ffff", lo)
+        return [self.names[i] for i in self._fold_order[lo:min(hi, lo + limit)]]
+
+    def entries(self, name):
+        """(leaderboard, row position) of every entry of ``name``."""
+        i = self._ids.get(name)
+        if i is None:
+            return []
+        span = slice(self._starts[i], self._starts[i + 1])
+        return list(zip(self._boards[span], self._positions[span]))
+
+    def position(self, name, leaderboard_name):
+        """Row position of ``name``'s (best) entry on ``leaderboard_name``, or None."""
+        for board_name, position in self.entries(name):
+            if board_name == leaderboard_name:
+                return position
+        return None
+
+    def profile(self, name, order=None):
+        """The snapshot rows of ``name``, one per leaderboard they are on.
+
+        Boards follow ``order`` (e.g. ``TABS``) when given.
+        """
+        by_board = {}
+        for board_name, position in self.entries(name):
+            # A name listed twice on one board keeps its best (first, rank-sorted) row
+            by_board.setdefault(board_name, position)
+        if order is not None:
+            rank = {board_name: i for i, board_name in enumerate(order)}
+            boards = sorted(by_board, key=lambda b: rank.get(b, len(rank)))
+        else:
+            boards = list(by_board)
+        rows = [self.snapshot[b].iloc[[by_board[b]]] for b in boards]
+        if not rows:
+            return self.snapshot.empty
+        return pd.concat(rows, ignore_index=True)
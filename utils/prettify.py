@@ -1,7 +1,10 @@
 from functools import lru_cache
 
+import numpy as np
 import pandas as pd
 
+from .typing import series_gap_ms_to_str, series_ms_to_str, zero_padded
+
 
 @lru_cache
 def prettify_colnames(col):
@@ -9,6 +12,61 @@ def prettify_colnames(col):
     return col.replace("_", " ").title()
 
 
+def standardize_series_label(raw: str) -> str:
+    s = str(raw).strip().replace("-", " ").replace(".", " ")
+    s_lower = s.lower()
+
+    # Heuristics to map to Top N naming
+    def to_top(n: str) -> str:
+        return f"Top {n}"
+
+    if (
+        any(tok in s_lower for tok in ["top1", "top 1", "rank1", "rank 1", "r1", "1 "])
+        or s_lower.endswith(" 1")
+        or s_lower.endswith("1")
+    ):
+        return to_top("1")
+    if (
+        any(tok in s_lower for tok in ["top2", "top 2", "rank2", "rank 2", "r2", "2 "])
+        or s_lower.endswith(" 2")
+        or s_lower.endswith("2")
+    ):
+        return to_top("2")
+    if (
+        any(tok in s_lower for tok in ["top3", "top 3", "rank3", "rank 3", "r3", "3 "])
+        or s_lower.endswith(" 3")
+        or s_lower.endswith("3")
+    ):
+        return to_top("3")
+    if (
+        any(
+            tok in s_lower
+            for tok in ["top10", "top 10", "rank10", "rank 10", "r10", "10 "]
+        )
+        or s_lower.endswith(" 10")
+        or s_lower.endswith("10")
+    ):
+        return to_top("10")
+    if (
+        any(
+            tok in s_lower
+            for tok in ["top100", "top 100", "rank100", "rank 100", "r100", "100 "]
+        )
+        or s_lower.endswith(" 100")
+        or s_lower.endswith("100")
+    ):
+        return to_top("100")
+    return prettify_colnames(s)
+
+
+def top_1_column(columns):
+    """The ``*_ms`` column holding Top 1 times, however it is named (None without one)."""
+    return next(
+        (c for c in columns if c.endswith("_ms") and standardize_series_label(c[:-3]) == "Top 1"),
+        None,
+    )
+
+
 def format_delta(td):
     seconds = int(td.total_seconds())
     if seconds < 60:
@@ -21,14 +79,73 @@ def format_delta(td):
         return f"{seconds // 86400} day(s) ago"
 
 
+def _format_delta_array(deltas):
+    valid = deltas.notna().to_numpy()
+    # truncate toward zero like int(td.total_seconds())
+    seconds = np.trunc(deltas.dt.total_seconds().fillna(0).to_numpy()).astype("int64")
+    conditions = [seconds < 60, seconds < 3600, seconds < 86400]
+    amount = np.select(conditions, [seconds, seconds // 60, seconds // 3600], seconds // 86400)
+    unit = np.select(
+        conditions, [" seconds ago", " minutes ago", " hour(s) ago"], " day(s) ago"
+    )
+    out = np.char.add(amount.astype(str), unit)
+    return np.where(valid, out, "")
+
+
+def _strftime_array(series):
+    valid = series.notna().to_numpy()
+    dt = series.dt
+    parts = [
+        zero_padded(dt.year.fillna(0), 4), "-",
+        zero_padded(dt.month.fillna(0), 2), "-",
+        zero_padded(dt.day.fillna(0), 2), " ",
+        zero_padded(dt.hour.fillna(0), 2), ":",
+        zero_padded(dt.minute.fillna(0), 2), ":",
+        zero_padded(dt.second.fillna(0), 2),
+    ]
+    out = parts[0]
+    for part in parts[1:]:
+        out = np.char.add(out, part)
+    return np.where(valid, out, "")
+
+
+def series_strftime(series):
+    """Vectorized ``series.dt.strftime("%Y-%m-%d %H:%M:%S")`` (NaT -> "")."""
+    return pd.Series(_strftime_array(series), index=series.index)
+
+
+def series_time_ago(series):
+    """" (<how long ago>)" for every timestamp, as of now (NaT -> "")."""
+    deltas = pd.to_datetime("now", utc=True) - series
+    formatted = np.char.add(np.char.add(" (", _format_delta_array(deltas)), ")")
+    return pd.Series(
+        np.where(series.notna().to_numpy(), formatted, ""), index=series.index
+    )
+
+
+def with_time_ago(df):
+    """``df`` with how long ago each entry was set appended to its cached ``Date``."""
+    return df.assign(Date=df["Date"] + series_time_ago(df["achieved_at"]))
+
+
 def series_human_friendly_time(series):
     now = pd.to_datetime("now", utc=True)
     deltas = now - series
 
-    formatted = (
-        series.dt.strftime("%Y-%m-%d %H:%M:%S")
-        + " ("
-        + deltas.apply(format_delta)
-        + ")"
+    formatted = np.char.add(
+        np.char.add(_strftime_array(series), " ("),
+        np.char.add(_format_delta_array(deltas), ")"),
+    )
+    return pd.Series(
+        np.where(series.notna().to_numpy(), formatted, ""), index=series.index
     )
-    return formatted
+
+
+def add_display_columns(df_snapshot):
+    # Format every row once per load so renders only slice the cached frame.
+    # Date is absolute: the "(... ago)" part goes stale and is added per render (with_time_ago)
+    df_snapshot["Time"] = series_ms_to_str(df_snapshot["duration_ms"])
+    df_snapshot["Gap"] = series_gap_ms_to_str(df_snapshot["gap_prev_ms"])
+    df_snapshot["Gap To Leader"] = series_gap_ms_to_str(df_snapshot["gap_leader_ms"])
+    df_snapshot["Date"] = series_strftime(df_snapshot["achieved_at"])
+    return df_snapshot
@@ -0,0 +1,125 @@
+"""Opt-in timing of loaders, parsing and page sections.
+
+Off by default and close to free when off: a section only checks whether the
+current run is being profiled. A run is profiled when a page is opened with
+``?profile=1`` (which also shows the debug panel), or for a random
+``PROFILE_SAMPLE_RATE`` share of runs, so it can stay on in production.
+
+Each profiled section records wall time, plus rows and bytes where the caller
+knows them. It is logged as one JSON line (INFO, ``utils.profiling`` logger)
+and added to process-wide counters, which the API serves in the Prometheus
+text format at ``/metrics``.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from .constants import PROFILE_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# The current run's records, or None when it is not profiled
+_records = ContextVar("profile_records", default=None)
+
+
+class Metrics:
+    """Per-section totals across every profiled run in the process."""
+
+    FIELDS = ("count", "seconds", "rows", "bytes")
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            totals = self._totals.setdefault(record["section"], dict.fromkeys(self.FIELDS, 0))
+            totals["count"] += 1
+            totals["seconds"] += record["seconds"]
+            totals["rows"] += record["rows"] or 0
+            totals["bytes"] += record["bytes"] or 0
+
+    def snapshot(self):
+        with self._lock:
+            return {section: dict(totals) for section, totals in self._totals.items()}
+
+    def prometheus(self, prefix="tfwr_section"):
+        lines = []
+        totals = self.snapshot()
+        for field in self.FIELDS:
+            name = f"{prefix}_{field}_total"
+            lines.append(f"# TYPE {name} counter")
+            for section, values in sorted(totals.items()):
+                lines.append(f'{name}{{section="{section}"}} {values[field]:g}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def start_run(force=False):
+    """Decide whether the current run is profiled; returns its record list or None."""
+    sampled = force or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+    records = [] if sampled else None
+    _records.set(records)
+    return records
+
+
+@contextmanager
+def run(force=False):
+    """Profile a block as a run of its own (e.g. a background refresh).
+
+    Inside a run that is already profiled, the block's sections join that run.
+    """
+    outer = _records.get()
+    if outer is not None:
+        yield outer
+        return
+    token = _records.set(None)
+    try:
+        yield start_run(force)
+    finally:
+        _records.reset(token)
+
+
+@contextmanager
+def section(name):
+    """Time a block; the caller may set ``rows``/``bytes`` on the yielded dict."""
+    records = _records.get()
+    stats = {"section": name, "rows": None, "bytes": None}
+    if records is None:
+        yield stats
+        return
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats["seconds"] = time.perf_counter() - start
+        records.append(stats)
+        metrics.add(stats)
+        logger.info(json.dumps(stats))
+
+
+def _size(result):
+    return len(result) if hasattr(result, "__len__") and not isinstance(result, str) else None
+
+
+def timed(name):
+    """Decorator form of ``section``; rows are taken from the result's length."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _records.get() is None:
+                return fn(*args, **kwargs)
+            with section(name) as stats:
+                result = fn(*args, **kwargs)
+                stats["rows"] = _size(result)
+            return result
+        return wrapper
+    return decorate
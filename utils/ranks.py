@@ -0,0 +1,44 @@
+"""Rank and percentile lookups against the snapshot.
+
+Every board's times are kept as one sorted int array, built once per snapshot
+version, so "what rank would this time get" and arbitrary percentiles are a
+binary search (or an index) per board instead of a scan.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class DurationIndex:
+    def __init__(self, snapshot, value_col="duration_ms"):
+        self.durations = {}
+        for name, board in snapshot.items():
+            self.durations[name] = np.sort(board[value_col].dropna().to_numpy(dtype="int64"))
+
+    def rank_of(self, leaderboard_name, duration_ms):
+        """(rank, share of entries at least as fast in %) ``duration_ms`` would get.
+
+        Ties share the better rank, so matching an existing time gives its rank.
+        """
+        values = self.durations.get(leaderboard_name)
+        if values is None or not len(values):
+            return None, None
+        rank = int(np.searchsorted(values, duration_ms, side="left")) + 1
+        return rank, 100 * rank / (len(values) + 1)
+
+    def percentile(self, leaderboard_name, pct):
+        """Time needed to be in the top ``pct`` percent of ``leaderboard_name``."""
+        values = self.durations.get(leaderboard_name)
+        if values is None or not len(values):
+            return None
+        position = int(np.ceil(pct / 100 * len(values))) - 1
+        return int(values[min(max(position, 0), len(values) - 1)])
+
+    def ranks_for(self, duration_ms, leaderboards=None):
+        """The rank and percentile ``duration_ms`` would get on every board."""
+        rows = []
+        for name in leaderboards or self.durations:
+            rank, pct = self.rank_of(name, duration_ms)
+            entries = len(self.durations.get(name, ()))
+            rows.append({"leaderboard_name": name, "rank": rank, "top_pct": pct, "entries": entries})
+        return pd.DataFrame(rows, columns=["leaderboard_name", "rank", "top_pct", "entries"])
@@ -0,0 +1,116 @@
+"""World-record progression from the over-time history.
+
+A record is set every time a board's running minimum of its Top 1 column
+(``top_1_ms``, or however ``prettify.top_1_column`` finds it) drops.
+The running minimum and its change points are computed per board with NumPy
+over the full history (not a chart window), once per history version, into
+one compact event table: one row per record, with how much it improved on
+the previous one and how long it stood.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .prettify import top_1_column
+
+EVENT_COLUMNS = [
+    "leaderboard_name",
+    "time",
+    "record_ms",
+    "previous_ms",
+    "improvement_ms",
+    "improvement_pct",
+    "stood_days",
+    "ms_per_day",
+    "current",
+]
+
+SUMMARY_COLUMNS = [
+    "leaderboard_name",
+    "record_ms",
+    "set_at",
+    "held_days",
+    "records",
+    "first_ms",
+    "total_improvement_pct",
+    "mean_days_between",
+]
+
+
+def board_records(board, time_col="time", value_col=None):
+    """Record events of one time-sorted board (None without any Top 1 times)."""
+    value_col = value_col or top_1_column(board.columns)
+    if value_col is None:
+        return None
+    board = board[board[value_col].notna() & board[time_col].notna()]
+    if board.empty:
+        return None
+    values = board[value_col].to_numpy(dtype="float64")
+    times = board[time_col].to_numpy(dtype="datetime64[ns]")
+
+    best = np.minimum.accumulate(values)
+    changed = np.flatnonzero(np.r_[True, best[1:] < best[:-1]])
+    record = best[changed]
+    # A record stands until the next one or, for the current one, until the latest scrape
+    days = (times[np.r_[changed, len(times) - 1]] - times[changed[0]]) / np.timedelta64(1, "D")
+    stood_days = np.diff(days)
+    since_previous = np.r_[np.nan, np.diff(days[:-1])]
+
+    previous = np.r_[np.nan, record[:-1]]
+    improvement = previous - record
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_day = np.where(since_previous > 0, improvement / since_previous, np.nan)
+    return pd.DataFrame({
+        "time": board[time_col].iloc[changed].reset_index(drop=True),
+        "record_ms": record,
+        "previous_ms": previous,
+        "improvement_ms": improvement,
+        "improvement_pct": 100 * improvement / previous,
+        "stood_days": stood_days,
+        "ms_per_day": per_day,
+        "current": np.arange(len(record)) == len(record) - 1,
+    })
+
+
+def build_record_events(over_time, time_col="time", value_col=None):
+    """One event table for every board of the history partitions."""
+    frames = []
+    for name, board in over_time.items():
+        events = board_records(board, time_col, value_col)
+        if events is not None:
+            events.insert(0, "leaderboard_name", name)
+            frames.append(events)
+    if not frames:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    events = pd.concat(frames, ignore_index=True)[EVENT_COLUMNS]
+    # Compact: categories, and int32 for millisecond values that always fit
+    return events.astype({
+        "leaderboard_name": "category",
+        "record_ms": "int32",
+        "previous_ms": "Int32",
+        "improvement_ms": "Int32",
+        "stood_days": "float32",
+        "improvement_pct": "float32",
+        "ms_per_day": "float32",
+    })
+
+
+def record_summary(events):
+    """Cross-board summary: the current record, when it was set, and how it got there."""
+    if events.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    grouped = events.groupby("leaderboard_name", observed=True, sort=False)
+    current = events[events["current"]].set_index("leaderboard_name")
+    first = grouped["record_ms"].first()
+    records = grouped.size()
+    span_days = (grouped["time"].last() - grouped["time"].first()) / pd.Timedelta(days=1)
+    summary = pd.DataFrame({
+        "record_ms": current["record_ms"],
+        "set_at": current["time"],
+        "held_days": current["stood_days"],
+        "records": records,
+        "first_ms": first,
+        "total_improvement_pct": 100 * (first - current["record_ms"]) / first,
+        "mean_days_between": span_days / (records - 1).where(records > 1),
+    })
+    return summary.rename_axis("leaderboard_name").reset_index()
@@ -0,0 +1,51 @@
+"""Hourly and daily rollups of the over-time history.
+
+Long history windows are drawn from these instead of raw scrapes, so a chart's
+cost depends on its width, not on how much history the window covers. Each
+bucket keeps the last value of every ``*_ms`` column under its own name, so
+charts treat a rollup like raw history. A bucket is timestamped with its last
+sample rather than the start of the bucket, so a Top 1 step is drawn at (or
+close to) its real time.
+"""
+
+import pandas as pd
+
+from .partition import LeaderboardPartitions
+
+# Coarsest first
+RESOLUTIONS = {"day": pd.Timedelta(days=1), "hour": pd.Timedelta(hours=1)}
+
+
+def rollup_board(board, freq, time_col="time"):
+    ms_cols = [c for c in board.columns if c.endswith("_ms")]
+    board = board.dropna(subset=[time_col])
+    grouped = board.groupby(board[time_col].dt.floor(freq), sort=True)
+    return grouped[[time_col] + ms_cols].last().reset_index(drop=True)
+
+
+def build_rollups(over_time, time_col="time"):
+    """resolution -> LeaderboardPartitions of rolled-up history, for every board."""
+    rollups = {}
+    for resolution, freq in RESOLUTIONS.items():
+        boards = {
+            name: rollup_board(board, freq, time_col) for name, board in over_time.items()
+        }
+        rollups[resolution] = LeaderboardPartitions(boards, over_time.empty)
+    return rollups
+
+
+def pick_resolution(window_days, span, min_buckets):
+    """Coarsest resolution that still gives ``min_buckets`` points across the window.
+
+    ``min_buckets`` is what the raw history would be drawn with after
+    downsampling (``utils.downsample.m4_buckets``), so a rollup is only used
+    when it is at least as fine. ``window_days=None`` means all history, whose
+    length is given by ``span``. Returns ``"raw"`` when no rollup is fine enough.
+    """
+    window = pd.Timedelta(days=window_days) if window_days is not None else span
+    if window is None:
+        return "raw"
+    for resolution, freq in RESOLUTIONS.items():
+        if window / freq >= min_buckets:
+            return resolution
+    return "raw"
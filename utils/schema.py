@@ -0,0 +1,76 @@
+"""Compact dtypes for the loaded frames.
+
+History and snapshot rows repeat the same leaderboard and player names and
+store small integers as float64/int64. Converting on load (categorical names,
+int32 milliseconds, the smallest int for ranks, nullable where values are
+missing) shrinks what each worker holds and what ``st.cache_data`` pickles.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .constants import TABS
+
+CATEGORY_COLUMNS = ["leaderboard_name", "steam_name"]
+_INT32 = np.iinfo("int32")
+
+
+def _leaderboard_dtype(values):
+    # Fixed category order so frames compacted separately still concat as categoricals
+    known = TABS[1:]
+    extra = sorted(set(values.dropna().unique()) - set(known))
+    return pd.CategoricalDtype(known + extra)
+
+
+def _compact_ints(series, dtype):
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    present = values[~np.isnan(values)]
+    if present.size and (present != np.floor(present)).any():
+        return series  # fractional values, keep as float
+    if present.size and (present.min() < _INT32.min or present.max() > _INT32.max):
+        dtype = "int64"
+    if present.size < values.size:
+        return series.astype(dtype.capitalize())  # nullable: Int32 / Int64 / Int16
+    return series.astype(dtype)
+
+
+def compact_frame(df):
+    """``df`` with compact dtypes; columns it does not know are left alone."""
+    df = df.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            if col == "leaderboard_name":
+                df[col] = df[col].astype(_leaderboard_dtype(df[col]))
+            else:
+                df[col] = df[col].astype("category")
+    for col in df.columns:
+        if col.endswith("_ms"):
+            if pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = _compact_ints(df[col], "int32")
+    if "rank" in df.columns and pd.api.types.is_numeric_dtype(df["rank"]):
+        rank = df["rank"]
+        small = rank.max() <= np.iinfo("int16").max if rank.notna().any() else True
+        df["rank"] = _compact_ints(rank, "int16" if small else "int32")
+    return df
+
+
+def frame_bytes(frame):
+    """Deep memory use of a frame, or of every frame in a dict of partitions."""
+    if isinstance(frame, dict):
+        return sum(frame_bytes(f) for f in frame.values())
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def memory_report(before, after):
+    """Bytes per named frame before and after compaction."""
+    rows = [
+        {
+            "frame": name,
+            "before_bytes": frame_bytes(before[name]),
+            "after_bytes": frame_bytes(after[name]),
+        }
+        for name in before
+    ]
+    report = pd.DataFrame(rows).set_index("frame")
+    report["ratio"] = report["after_bytes"] / report["before_bytes"]
+    return report
@@ -0,0 +1,193 @@
+"""Reading and writing the published leaderboard tables.
+
+Each table is published as CSV and, optionally, as a Parquet object next to
+it. Readers prefer the Parquet copy (typed columns, native timestamps, column
+projection and row-group pruning on ``leaderboard_name``) and fall back to
+the CSV when it has not been published, or when it was not built from the
+current CSV (a stale copy must not hide newer data).
+
+    python -m utils.storage <csv_url> <parquet_url> [time_col ...]
+"""
+
+import io
+import operator
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fsspec.core import url_to_fs
+
+from .fetch import object_cache, object_version
+from .profiling import section
+from .timestamps import parse_timestamps
+
+_OPS = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _apply_filters(df, filters):
+    # Same (column, op, value) triples pyarrow takes, for the CSV fallback
+    mask = pd.Series(True, index=df.index)
+    for col, op, value in filters:
+        if op == "in":
+            mask &= df[col].isin(value)
+        elif op == "not in":
+            mask &= ~df[col].isin(value)
+        else:
+            mask &= _OPS[op](df[col], value)
+    return df[mask].reset_index(drop=True)
+
+
+def _parse_csv(data, columns=None, filters=None, time_cols=(), source=None):
+    with section("parse.csv") as stats:
+        df = pd.read_csv(io.BytesIO(data), usecols=columns)
+        stats["rows"], stats["bytes"] = len(df), len(data)
+    with section("parse.datetime") as stats:
+        formats = {}
+        for col in time_cols:
+            if col in df.columns:
+                df[col], formats[col], _ = parse_timestamps(df[col], source=source)
+        stats["rows"] = len(df)
+    # The parsed schema travels with the frame: downstream code checks dtypes, never re-parses
+    df.attrs["time_formats"] = formats
+    if filters:
+        df = _apply_filters(df, filters)
+    return df
+
+
+def _parse_parquet(data, columns=None, filters=None):
+    return pd.read_parquet(io.BytesIO(data), columns=columns, filters=filters)
+
+
+def _parquet_source_version(data):
+    # Only the footer is read
+    return (pq.read_schema(io.BytesIO(data)).metadata or {}).get(SOURCE_VERSION_KEY)
+
+
+def _csv_version(csv_url, cache):
+    try:
+        return object_version(cache.head(csv_url)[2]).encode()
+    except FileNotFoundError:
+        return None
+
+
+def read_csv_table(csv_url, columns=None, filters=None, time_cols=()):
+    fs, path = url_to_fs(csv_url)
+    return _parse_csv(fs.cat_file(path), columns, filters, time_cols, source=csv_url)
+
+
+def read_table(
+    parquet_url, csv_url, columns=None, filters=None, time_cols=(), prepare=None,
+    cache=object_cache,
+):
+    """Read a published table, only materializing ``columns`` and rows matching ``filters``.
+
+    Objects go through ``cache``, so an unchanged object is neither downloaded
+    nor parsed again: the previous result (after ``prepare``, if given) is
+    returned as-is and must not be mutated.
+
+    The Parquet copy is only used when it records the version of the CSV it
+    was built from and that is still the CSV's version (or there is no CSV).
+    """
+    prepare = prepare or (lambda df: df)
+    key = repr((columns, filters, time_cols, getattr(prepare, "__qualname__", None)))
+    if parquet_url:
+        try:
+            df, source_version = cache.get(
+                parquet_url,
+                lambda data: (
+                    prepare(_parse_parquet(data, columns, filters)),
+                    _parquet_source_version(data),
+                ),
+                key=key,
+            )
+        except FileNotFoundError:
+            pass
+        else:
+            csv_version = _csv_version(csv_url, cache) if csv_url else None
+            if csv_version is None or csv_version == source_version:
+                return df
+    return cache.get(
+        csv_url,
+        lambda data: prepare(_parse_csv(data, columns, filters, time_cols, source=csv_url)),
+        key=key,
+    )
+
+
+# Parquet key/value metadata recording which CSV object (and which prefix of it) a copy holds
+SOURCE_VERSION_KEY = b"tfwr.source_csv_version"
+SOURCE_SIZE_KEY = b"tfwr.source_csv_size"
+SOURCE_TAIL_KEY = b"tfwr.source_csv_tail"
+
+
+def read_parquet_source(parquet_url):
+    """Read a Parquet copy plus the (size, tail bytes) of the CSV prefix it was built from.
+
+    Returns ``(None, None)`` when there is no Parquet copy and ``(df, None)``
+    when it carries no source metadata.
+    """
+    fs, path = url_to_fs(parquet_url)
+    try:
+        with fs.open(path, "rb") as f:
+            table = pq.read_table(f)
+    except FileNotFoundError:
+        return None, None
+    metadata = table.schema.metadata or {}
+    source = None
+    if SOURCE_SIZE_KEY in metadata:
+        source = (
+            int(metadata[SOURCE_SIZE_KEY]),
+            bytes.fromhex(metadata[SOURCE_TAIL_KEY].decode()),
+        )
+    return table.to_pandas(), source
+
+
+def write_parquet(
+    df, parquet_url, time_cols=(), partition_col="leaderboard_name", metadata=None
+):
+    """Write ``df`` with one row group per ``partition_col`` value.
+
+    Row-group statistics then let a ``leaderboard_name`` filter skip every
+    other board without decoding it.
+    """
+    df = df.copy()
+    for col in time_cols:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col], _, _ = parse_timestamps(df[col], source=parquet_url)
+    df = df.sort_values(partition_col, kind="stable", ignore_index=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata({**table.schema.metadata, **metadata})
+
+    fs, path = url_to_fs(parquet_url)
+    with fs.open(path, "wb") as f, pq.ParquetWriter(f, table.schema) as writer:
+        for _, board in df.groupby(partition_col, sort=False).indices.items():
+            writer.write_table(table.take(board))
+
+
+def csv_to_parquet(csv_url, parquet_url, time_cols=(), tail_size=256):
+    fs, path = url_to_fs(csv_url)
+    # Taken before the download: if the CSV changes in between, the copy reads as stale
+    version = object_version(fs.info(path))
+    data = fs.cat_file(path)
+    # Only whole lines, so an incremental reader can resume from this offset
+    size = data.rfind(b"\n") + 1
+    metadata = {
+        SOURCE_VERSION_KEY: version.encode(),
+        SOURCE_SIZE_KEY: str(size).encode(),
+        SOURCE_TAIL_KEY: data[max(0, size - tail_size):size].hex().encode(),
+    }
+    df = pd.read_csv(io.BytesIO(data[:size]))
+    write_parquet(df, parquet_url, time_cols=time_cols, metadata=metadata)
+
+
+if __name__ == "__main__":
+    csv_to_parquet(sys.argv[1], sys.argv[2], time_cols=sys.argv[3:])
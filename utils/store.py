@@ -0,0 +1,275 @@
+"""Process-wide, read-only store of the loaded leaderboard data.
+
+``st.cache_data`` hands every session a fresh deep copy of each cached frame
+on every rerun, so memory and latency grow with the number of viewers. The
+store instead holds one ``StoreData`` per data version and gives every session
+the same objects. A single background thread refreshes it ahead of each
+interval, fetching the three objects concurrently, and swaps in a new
+``StoreData`` with one assignment, so readers always see a complete version
+and never wait on S3 (except for the very first load of the process).
+
+The full history is only loaded once a page asks for it (``history_data``);
+until then the per-board last-updated times come from the end of the history
+CSV alone. Once it is loaded, the refresher also runs the ``on_history``
+callbacks for each new history version, so the values they ``derive`` are
+ready before the next session asks for them.
+
+Frames in the store are shared: treat them as read-only.
+"""
+
+import logging
+import threading
+import time
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .cache import LRUCache
+from .constants import (
+    OVER_TIME_S3,
+    GAPS_LATEST_S3,
+    PERCENTILES_S3,
+    OVER_TIME_PARQUET_S3,
+    GAPS_LATEST_PARQUET_S3,
+    PERCENTILES_PARQUET_S3,
+    SNAPSHOT_COLUMNS,
+    REFRESH_INTERVAL_S,
+    DERIVED_CACHE_ENTRIES,
+)
+from .fetch import object_cache
+from .history import IncrementalHistory, LatestTimestamps
+from .movers import MoversFeed
+from .partition import partition_by_leaderboard
+from .prettify import add_display_columns
+from .profiling import run, timed
+from .schema import compact_frame
+from .storage import read_table
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# name -> (CSV URL, Parquet URL) of each published object
+DEFAULT_URLS = {
+    "over_time": (OVER_TIME_S3, OVER_TIME_PARQUET_S3),
+    "gaps_latest": (GAPS_LATEST_S3, GAPS_LATEST_PARQUET_S3),
+    "percentiles": (PERCENTILES_S3, PERCENTILES_PARQUET_S3),
+}
+FILE_NAMES = {"over_time": "over_time_ms", "gaps_latest": "gaps_latest_ms", "percentiles": "percentiles"}
+
+
+def urls_for(base_url):
+    """``DEFAULT_URLS`` for a copy of the published files under ``base_url``."""
+    base_url = base_url.rstrip("/")
+    return {
+        name: (f"{base_url}/{stem}.csv", f"{base_url}/{stem}.parquet")
+        for name, stem in FILE_NAMES.items()
+    }
+
+
+@timed("load.gaps_latest")
+def load_gaps_latest(urls=DEFAULT_URLS, cache=object_cache):
+    csv_url, parquet_url = urls["gaps_latest"]
+    return read_table(
+        parquet_url,
+        csv_url,
+        columns=SNAPSHOT_COLUMNS,
+        time_cols=["achieved_at"],
+        prepare=prepare_snapshot,
+        cache=cache,
+    )
+
+
+def prepare_snapshot(df):
+    # Unranked rows are never shown, and a nullable rank could not be binary searched
+    df = df.dropna(subset=["rank"])
+    return partition_by_leaderboard(add_display_columns(compact_frame(df)), "rank")
+
+
+@timed("load.percentiles")
+def load_percentiles(urls=DEFAULT_URLS, cache=object_cache):
+    csv_url, parquet_url = urls["percentiles"]
+    return read_table(parquet_url, csv_url, prepare=prepare_percentiles, cache=cache)
+
+
+def prepare_percentiles(df):
+    records = df.to_dict(orient="records")
+    data = {r["leaderboard_name"]: r for r in records}
+    return data
+
+
+@dataclass(frozen=True)
+class StoreData:
+    over_time: dict  # None until a page asks for the history
+    last_updated: dict  # leaderboard -> last history timestamp
+    history_version: object
+    snapshot: dict
+    snapshot_version: int
+    percentiles: dict
+    percentiles_version: int
+    movers: pd.DataFrame  # recent snapshot changes, newest first
+    refreshed_at: pd.Timestamp
+    refresh_seconds: float  # how long the refresh that produced this version took
+    last_updated_text: dict  # leaderboard -> formatted timestamp, formatted once per version
+
+    def age(self):
+        """Time since this version was loaded."""
+        return pd.Timestamp.now(tz="UTC") - self.refreshed_at
+
+
+class DataStore:
+    def __init__(self, refresh_interval=REFRESH_INTERVAL_S, urls=DEFAULT_URLS, cache=object_cache):
+        self.refresh_interval = refresh_interval
+        self.urls = urls
+        self.cache = cache
+        self.history = IncrementalHistory(*urls["over_time"], cache=cache)
+        self.latest = LatestTimestamps(urls["over_time"][0], cache=cache)
+        self.history_wanted = False
+        self.movers = MoversFeed()
+        self.last_refresh_profile = []  # sections of the last profiled refresh
+        self._data = None
+        self._derived = LRUCache(DERIVED_CACHE_ENTRIES)
+        self._refresh_lock = threading.Lock()
+        self._derive_lock = threading.Lock()  # guards _building only
+        self._building = {}  # (name, version) -> lock held while that value is built
+        self._history_callbacks = []
+        self._warmed_version = None
+        self._thread = None
+
+    @property
+    def data(self):
+        """The current version; only the first call of the process loads inline."""
+        data = self._data
+        if data is None:
+            data = self.refresh()
+        return data
+
+    def history_data(self):
+        """The current version with the history loaded (inline the first time)."""
+        self.history_wanted = True
+        data = self.data
+        if data.over_time is None:
+            data = self.refresh()
+        return data
+
+    def refresh(self):
+        """Load whatever changed and swap in the new version."""
+        with self._refresh_lock, run() as records:
+            start = time.perf_counter()
+            # Read once: a session may ask for the history while this refresh runs
+            history_wanted = self.history_wanted
+            # The three objects are independent; fetch and parse them side by side
+            with ThreadPoolExecutor(max_workers=3, thread_name_prefix="data-store-fetch") as pool:
+                # Each task gets a copy of this context so its sections land in `records`
+                if history_wanted:
+                    history = pool.submit(
+                        copy_context().run, timed("load.history")(self.history.refresh)
+                    )
+                else:
+                    history = pool.submit(
+                        copy_context().run, timed("load.latest")(self.latest.refresh)
+                    )
+                snapshot = pool.submit(copy_context().run, load_gaps_latest, self.urls, self.cache)
+                percentiles = pool.submit(
+                    copy_context().run, load_percentiles, self.urls, self.cache
+                )
+            if history_wanted:
+                history.result()
+                history_version, over_time, last_updated = self.history.current
+            else:
+                history_version, over_time, last_updated = None, None, history.result()
+            # Unchanged objects come back as the same parsed object (see utils.fetch)
+            snapshot = snapshot.result()
+            percentiles = percentiles.result()
+
+            prev = self._data
+            if prev is None:
+                snapshot_version = percentiles_version = 0
+                movers = self.movers.recent()
+            else:
+                snapshot_version = prev.snapshot_version + (snapshot is not prev.snapshot)
+                percentiles_version = prev.percentiles_version + (
+                    percentiles is not prev.percentiles
+                )
+                movers = prev.movers
+                if snapshot is not prev.snapshot:
+                    self.movers.update(prev.snapshot, snapshot)
+                    movers = self.movers.recent()
+            if records is not None:
+                self.last_refresh_profile = records
+            self._data = StoreData(
+                over_time=over_time,
+                last_updated=last_updated,
+                history_version=history_version,
+                snapshot=snapshot,
+                snapshot_version=snapshot_version,
+                percentiles=percentiles,
+                percentiles_version=percentiles_version,
+                movers=movers,
+                refreshed_at=pd.Timestamp.now(tz="UTC"),
+                refresh_seconds=time.perf_counter() - start,
+                last_updated_text=(
+                    prev.last_updated_text
+                    if prev is not None and prev.last_updated is last_updated
+                    else {name: str(ts) for name, ts in last_updated.items()}
+                ),
+            )
+            return self._data
+
+    def derive(self, name, version, build):
+        """``build()`` memoized per (name, version): derived data is computed once
+        per data version, not once per session or rerun."""
+        key = (name, version)
+        value = self._derived.get(key, _MISSING)
+        if value is _MISSING:
+            # One lock per key: sessions only wait for the value they need, and a
+            # build may derive other values
+            with self._derive_lock:
+                lock = self._building.setdefault(key, threading.Lock())
+            with lock:
+                value = self._derived.get(key, _MISSING)
+                if value is _MISSING:
+                    value = build()
+                    self._derived.put(key, value)
+            with self._derive_lock:
+                self._building.pop(key, None)
+        return value
+
+    def on_history(self, callback):
+        """Run ``callback(store, data)`` in the refresher for every new history version."""
+        self._history_callbacks.append(callback)
+
+    def start(self):
+        """Start the background refresher (once)."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="data-store-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            # Start the next refresh early enough that it lands one interval after the last
+            data = self._data
+            took = data.refresh_seconds if data is not None else 0
+            time.sleep(max(self.refresh_interval - took, 1))
+            try:
+                data = self.refresh()
+            except Exception:
+                # Keep serving the previous version; try again next interval
+                logger.exception("Data store refresh failed")
+                continue
+            self._warm(data)
+
+    def _warm(self, data):
+        if data.over_time is None or data.history_version == self._warmed_version:
+            return
+        for callback in self._history_callbacks:
+            try:
+                callback(self, data)
+            except Exception:
+                # Sessions still build the value on demand
+                logger.exception("Deriving from history version %s failed", data.history_version)
+        self._warmed_version = data.history_version
@@ -1,3 +1,7 @@
+import math
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
 
@@ -26,4 +30,69 @@ def ms_to_str(ms):
 
 
 def gap_ms_to_str(ms):
-    return f"+{ms_to_str(ms)}" if ms and ms > 0 else ""
\ No newline at end of file
+    return f"+{ms_to_str(ms)}" if ms and ms > 0 else ""
+
+
+def str_to_ms(text):
+    """Inverse of ``ms_to_str``: "[hh:]mm:ss[.mmm]" or plain seconds -> ms (None if invalid)."""
+    try:
+        parts = [float(p) for p in text.strip().split(":")]
+    except ValueError:
+        return None
+    if not 1 <= len(parts) <= 3 or any(p < 0 or not math.isfinite(p) for p in parts):
+        return None
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return round(seconds * 1000)
+
+
+@lru_cache
+def _padded_table(width):
+    return np.array([f"{i:0{width}d}" for i in range(10**width)])
+
+
+def zero_padded(values, width):
+    """Format an int array as zero-padded strings without a Python loop per value.
+
+    Values inside ``[0, 10**width)`` come from a lookup table; anything else
+    (negative or wider) falls back to numpy's own int -> str conversion.
+    """
+    values = np.asarray(values, dtype="int64")
+    table = _padded_table(width)
+    out = table[np.clip(values, 0, len(table) - 1)]
+    wide = (values < 0) | (values >= len(table))
+    if wide.any():
+        out = out.astype(object)
+        out[wide] = values[wide].astype(str)
+        out = out.astype(str)
+    return out
+
+
+def _ms_to_str_array(series):
+    valid = series.notna().to_numpy()
+    total = series.fillna(0).to_numpy(dtype="int64")
+
+    s, ms = np.divmod(total, 1000)
+    m, s = np.divmod(s, 60)
+    h, m = np.divmod(m, 60)
+
+    out = np.char.add(np.char.add(zero_padded(m, 2), ":"), zero_padded(s, 2))
+    out = np.char.add(np.char.add(out, "."), zero_padded(ms, 3))
+    has_hours = h != 0
+    if has_hours.any():
+        with_hours = np.char.add(np.char.add(zero_padded(h, 2), ":"), out)
+        out = np.where(has_hours, with_hours, out)
+    return np.where(valid, out, "")
+
+
+def series_ms_to_str(series):
+    """Vectorized ``ms_to_str`` for a whole Series of milliseconds."""
+    return pd.Series(_ms_to_str_array(series), index=series.index)
+
+
+def series_gap_ms_to_str(series):
+    """Vectorized ``gap_ms_to_str``: only positive gaps get a ``+`` string."""
+    positive = (series > 0).to_numpy(dtype=bool, na_value=False)
+    out = np.char.add("+", _ms_to_str_array(series))
+    return pd.Series(np.where(positive, out, ""), index=series.index)